@@ -1,11 +1,15 @@
 """Weather Vn integration."""
+import asyncio
 import logging
 import datetime
+from typing import Any
+import zlib
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
@@ -13,8 +17,31 @@ from .const import (
     CONF_DISTRICT,
     CONF_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    CONF_BATCH_MODE,
+    DEFAULT_BATCH_MODE,
+    BATCH_MODE_OFF,
+    CONF_HTML_PARSER,
+    DEFAULT_HTML_PARSER,
+    CONF_MAX_STALE_AGE,
+    DEFAULT_MAX_STALE_AGE,
+    SECTION_WEATHER,
+    STALE_RETRY_INTERVAL,
+    STARTUP_SPREAD,
+    CONF_HEDGE_PERCENTILE,
+    DEFAULT_HEDGE_PERCENTILE,
+    HEDGE_OFF,
+)
+from .batch import (
+    WeatherVnBatchScheduler,
+    async_get_batch_group,
+    async_register_batch,
+    async_unregister_batch,
 )
 from .data_service import WeatherVnDataService, WeatherVnDataError
+from .executor import async_get_parse_executor, async_release_parse_executor
+from .html_parser import select_backend
+from .network import async_get_http_client, async_release_http_client
+from .snapshot import WeatherVnSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,26 +56,92 @@ class WeatherVnDataUpdateCoordinator(DataUpdateCoordinator):
         """Khởi tạo."""
         self.province = entry.data.get(CONF_PROVINCE)
         self.district = entry.data.get(CONF_DISTRICT)
-        self.data_service = WeatherVnDataService(self.province, self.district)
+        self.http_client = async_get_http_client(hass)
+        self.parse_executor = async_get_parse_executor(hass)
+        self.html_parser = select_backend(entry.options.get(CONF_HTML_PARSER, DEFAULT_HTML_PARSER))
+        hedge = entry.options.get(CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE)
+        self.data_service = WeatherVnDataService(
+            self.province,
+            self.district,
+            self.http_client.session,
+            self.parse_executor,
+            self.html_parser,
+            int(entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)) * 60,
+            # "p95" -> 95
+            None if hedge == HEDGE_OFF else int(hedge[1:]),
+        )
 
         scan_interval = entry.options.get(
             CONF_SCAN_INTERVAL,
             entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
         )
+        self.scan_interval = datetime.timedelta(minutes=scan_interval)
+        # Độ lệch cố định theo mục cấu hình để các mục không cùng cập nhật một lúc
+        spread = zlib.crc32(entry.entry_id.encode())
+        self.jitter = datetime.timedelta(
+            seconds=spread % int(self.scan_interval.total_seconds())
+        )
+        # Độ trễ của lần làm mới đầu khi khởi động bằng ảnh chụp, cũng lệch theo mục cấu hình
+        self.startup_delay = datetime.timedelta(seconds=spread % STARTUP_SPREAD)
+        self._pending_jitter = self.jitter
+        self.batch_mode = entry.options.get(CONF_BATCH_MODE, DEFAULT_BATCH_MODE)
+        # Bộ lập lịch của nhóm khi chạy theo lô, được gán trong async_setup_entry
+        self.batch_scheduler: WeatherVnBatchScheduler | None = None
+        self.snapshot = WeatherVnSnapshotStore(hass, entry.entry_id)
+        # Thời điểm lưu ảnh chụp khi dữ liệu hiện tại được nạp từ đĩa (chưa làm mới từ mạng)
+        self.restored_at: datetime.datetime | None = None
 
         super().__init__(
             hass,
             _LOGGER,
             name=f"{DOMAIN}-{self.province}-{self.district}",
-            update_interval=datetime.timedelta(minutes=scan_interval),
+            # Ở chế độ theo lô, bộ lập lịch của nhóm sẽ gọi làm mới thay cho timer riêng
+            update_interval=self.scan_interval if self.batch_mode == BATCH_MODE_OFF else None,
+            # Dữ liệu không đổi thì không báo cho thực thể, tránh ghi trạng thái vô ích
+            always_update=False,
         )
 
     async def _async_update_data(self):
         """Cập nhật dữ liệu qua API."""
         try:
-            return await self.data_service.get_data()
+            data = await self.data_service.get_data()
         except WeatherVnDataError as err:
             raise UpdateFailed(f"Lỗi khi lấy dữ liệu: {err}") from err
+        finally:
+            if self.update_interval is not None:
+                # Chỉ lần hẹn giờ đầu tiên bị lùi thêm độ lệch, sau đó giữ đúng chu kỳ
+                self.update_interval = self.scan_interval + self._pending_jitter
+                self._pending_jitter = datetime.timedelta(0)
+
+        if SECTION_WEATHER in self.data_service.stale_sections and self.update_interval is not None:
+            # Đang dùng tạm dữ liệu thời tiết cũ: thử lại sớm hơn chu kỳ thường
+            self.update_interval = min(
+                self.scan_interval, datetime.timedelta(minutes=STALE_RETRY_INTERVAL)
+            )
+        if data != self.data:
+            self.snapshot.async_schedule_save(data)
+        self.restored_at = None
+        return data
+
+    async def async_revalidate_snapshot(self) -> None:
+        """Làm mới từ mạng sau khi khởi động bằng ảnh chụp, lùi theo độ trễ khởi động của mục."""
+        await asyncio.sleep(self.startup_delay.total_seconds())
+        await self.async_refresh()
+        # Dữ liệu mới có thể trùng ảnh chụp (không báo cho thực thể), vẫn cập nhật để bỏ tuổi ảnh chụp
+        self.async_update_listeners()
+
+    def section_attributes(self, section: str) -> dict[str, Any]:
+        """Thuộc tính fetched_at/stale của phần dữ liệu mà thực thể dùng, kèm tuổi ảnh chụp."""
+        return {**self.data_service.section_status(section), **self.snapshot_attributes()}
+
+    def snapshot_attributes(self) -> dict[str, Any]:
+        """Thuộc tính cho thực thể khi dữ liệu đang lấy từ ảnh chụp trên đĩa."""
+        if self.restored_at is None:
+            return {}
+        return {
+            "snapshot_saved_at": self.restored_at.isoformat(),
+            "snapshot_age": int((dt_util.utcnow() - self.restored_at).total_seconds()),
+        }
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -56,16 +149,54 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
 
     coordinator = WeatherVnDataUpdateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
+    restored = await coordinator.snapshot.async_load()
+    if restored is None:
+        # Chưa có dữ liệu nào để hiển thị nên lần tải đầu không lùi. Chỉ xảy ra khi chưa có
+        # ảnh chụp dùng được (lần cài đặt đầu, tệp hỏng); các lần khởi động khác được rải
+        # theo STARTUP_SPREAD
+        await coordinator.async_config_entry_first_refresh()
+    else:
+        # Có ảnh chụp: thực thể dùng ngay dữ liệu cũ, việc tải từ mạng chạy nền
+        coordinator.data, coordinator.restored_at = restored
+        _LOGGER.debug("Khởi động %s từ ảnh chụp lưu lúc %s", coordinator.name, coordinator.restored_at)
+        entry.async_create_background_task(
+            hass, coordinator.async_revalidate_snapshot(), f"{coordinator.name}-revalidate"
+        )
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    if coordinator.batch_mode != BATCH_MODE_OFF:
+        group_id = await async_get_batch_group(hass, coordinator.province, coordinator.batch_mode)
+        coordinator.batch_scheduler = async_register_batch(
+            hass, group_id, entry.entry_id, coordinator
+        )
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Tải lại mục cấu hình khi tùy chọn thay đổi."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Gỡ bỏ mục cấu hình."""
-    # Xóa coordinator khỏi hass.data
-    hass.data[DOMAIN].pop(entry.entry_id)
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        # Xóa coordinator khỏi hass.data
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        if coordinator.batch_scheduler is not None:
+            async_unregister_batch(hass, coordinator.batch_scheduler.group_id, entry.entry_id)
+        if not hass.data[DOMAIN]:
+            # Mục cấu hình cuối cùng đã gỡ, đóng phiên HTTP và nhóm luồng dùng chung
+            await async_release_http_client(hass)
+            async_release_parse_executor(hass)
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Xóa ảnh chụp dữ liệu khi mục cấu hình bị xóa."""
+    await WeatherVnSnapshotStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,136 @@
+"""Bộ lập lịch cập nhật theo lô cho Weather Vn."""
+from __future__ import annotations
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING, Any, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MODE_REGION,
+    DATA_BATCH_SCHEDULERS,
+    load_json_data,
+)
+
+if TYPE_CHECKING:
+    from . import WeatherVnDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WeatherVnBatchScheduler:
+    """Làm mới tất cả quận/huyện của một tỉnh hoặc vùng trong một lượt theo lịch."""
+
+    def __init__(self, hass: HomeAssistant, group_id: str) -> None:
+        """Khởi tạo bộ lập lịch cho một nhóm."""
+        self.hass = hass
+        self.group_id = group_id
+        self._coordinators: dict[str, WeatherVnDataUpdateCoordinator] = {}
+        self._semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+        self._interval: datetime.timedelta | None = None
+        self._unsub_timer: Callable[[], None] | None = None
+        self.last_pass_duration: float | None = None
+
+    @callback
+    def async_add(self, entry_id: str, coordinator: WeatherVnDataUpdateCoordinator) -> None:
+        """Thêm một coordinator vào nhóm."""
+        self._coordinators[entry_id] = coordinator
+        self._async_reschedule()
+
+    @callback
+    def async_remove(self, entry_id: str) -> bool:
+        """Gỡ một coordinator, trả về True nếu nhóm đã rỗng."""
+        self._coordinators.pop(entry_id, None)
+        if not self._coordinators:
+            self._async_cancel_timer()
+            return True
+        self._async_reschedule()
+        return False
+
+    @callback
+    def _async_reschedule(self) -> None:
+        """Đặt lại bộ hẹn giờ theo chu kỳ ngắn nhất của các thành viên."""
+        interval = min(c.scan_interval for c in self._coordinators.values())
+        if interval == self._interval and self._unsub_timer is not None:
+            return
+        self._async_cancel_timer()
+        self._interval = interval
+        self._unsub_timer = async_track_time_interval(
+            self.hass,
+            self._async_refresh_all,
+            interval,
+            name=f"weather_vn batch {self.group_id}",
+            cancel_on_shutdown=True,
+        )
+
+    @callback
+    def _async_cancel_timer(self) -> None:
+        """Hủy bộ hẹn giờ hiện tại."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    async def _async_refresh_all(self, now: datetime.datetime | None = None) -> None:
+        """Làm mới toàn bộ thành viên với số kết nối đồng thời có giới hạn."""
+        start = self.hass.loop.time()
+        await asyncio.gather(
+            *(self._async_refresh_one(c) for c in list(self._coordinators.values()))
+        )
+        self.last_pass_duration = round(self.hass.loop.time() - start, 3)
+        _LOGGER.debug(
+            "Nhóm %s: đã làm mới %d quận/huyện trong %.2f giây",
+            self.group_id,
+            len(self._coordinators),
+            self.last_pass_duration,
+        )
+
+    async def _async_refresh_one(self, coordinator: WeatherVnDataUpdateCoordinator) -> None:
+        """Làm mới một coordinator; kết quả được gửi tới các thực thể của mục đó."""
+        async with self._semaphore:
+            await coordinator.async_refresh()
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về thông tin chẩn đoán của nhóm."""
+        return {
+            "group": self.group_id,
+            "members": len(self._coordinators),
+            "interval": str(self._interval),
+            "last_pass_duration": self.last_pass_duration,
+        }
+
+
+async def async_get_batch_group(hass: HomeAssistant, province: str, mode: str) -> str:
+    """Xác định khóa nhóm (tỉnh hoặc vùng) cho một tỉnh."""
+    if mode == BATCH_MODE_REGION:
+        regions = await load_json_data(hass, "regions.json")
+        for region in regions.get("regions", []):
+            if province in region.get("provinces", []):
+                return f"region:{region['id']}"
+    return f"province:{province}"
+
+
+@callback
+def async_register_batch(
+    hass: HomeAssistant, group_id: str, entry_id: str, coordinator: WeatherVnDataUpdateCoordinator
+) -> WeatherVnBatchScheduler:
+    """Đăng ký coordinator với bộ lập lịch của nhóm (tạo mới nếu cần)."""
+    schedulers: dict[str, WeatherVnBatchScheduler] = hass.data.setdefault(
+        DATA_BATCH_SCHEDULERS, {}
+    )
+    scheduler = schedulers.get(group_id)
+    if scheduler is None:
+        scheduler = schedulers[group_id] = WeatherVnBatchScheduler(hass, group_id)
+    scheduler.async_add(entry_id, coordinator)
+    return scheduler
+
+
+@callback
+def async_unregister_batch(hass: HomeAssistant, group_id: str, entry_id: str) -> None:
+    """Gỡ coordinator khỏi bộ lập lịch, xóa bộ lập lịch khi nhóm rỗng."""
+    schedulers: dict[str, WeatherVnBatchScheduler] = hass.data.get(DATA_BATCH_SCHEDULERS, {})
+    scheduler = schedulers.get(group_id)
+    if scheduler is not None and scheduler.async_remove(entry_id):
+        schedulers.pop(group_id)
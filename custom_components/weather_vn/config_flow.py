@@ -13,6 +13,18 @@ from .const import (
     CONF_DISTRICT,
     CONF_SCAN_INTERVAL,
     DEFAULT_SCAN_INTERVAL,
+    CONF_BATCH_MODE,
+    BATCH_MODES,
+    DEFAULT_BATCH_MODE,
+    CONF_HTML_PARSER,
+    HTML_PARSERS,
+    DEFAULT_HTML_PARSER,
+    CONF_MAX_STALE_AGE,
+    DEFAULT_MAX_STALE_AGE,
+    MAX_MAX_STALE_AGE,
+    CONF_HEDGE_PERCENTILE,
+    HEDGE_PERCENTILES,
+    DEFAULT_HEDGE_PERCENTILE,
     _load_json_data_async,
 )
 
@@ -128,14 +140,28 @@ class WeatherVnOptionsFlow(config_entries.OptionsFlow):
             CONF_SCAN_INTERVAL,
             self._entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
         )
+        current_batch_mode = self._entry.options.get(CONF_BATCH_MODE, DEFAULT_BATCH_MODE)
+        current_html_parser = self._entry.options.get(CONF_HTML_PARSER, DEFAULT_HTML_PARSER)
+        current_max_stale_age = self._entry.options.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+        current_hedge_percentile = self._entry.options.get(
+            CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE
+        )
 
         if user_input is not None:
             try:
                 scan_interval = int(user_input[CONF_SCAN_INTERVAL])
                 if 5 <= scan_interval <= 180:
-                    # Chỉ lưu thời gian cập nhật vào options
+                    # Chỉ lưu thời gian cập nhật và chế độ cập nhật vào options
                     options = {
                         CONF_SCAN_INTERVAL: scan_interval,
+                        CONF_BATCH_MODE: user_input.get(CONF_BATCH_MODE, DEFAULT_BATCH_MODE),
+                        CONF_HTML_PARSER: user_input.get(CONF_HTML_PARSER, DEFAULT_HTML_PARSER),
+                        CONF_MAX_STALE_AGE: int(
+                            user_input.get(CONF_MAX_STALE_AGE, DEFAULT_MAX_STALE_AGE)
+                        ),
+                        CONF_HEDGE_PERCENTILE: user_input.get(
+                            CONF_HEDGE_PERCENTILE, DEFAULT_HEDGE_PERCENTILE
+                        ),
                     }
                     return self.async_create_entry(title="", data=options)
                 else:
@@ -160,6 +186,30 @@ class WeatherVnOptionsFlow(config_entries.OptionsFlow):
                         unit_of_measurement="phút",
                     )
                 ),
+                vol.Required(
+                    CONF_BATCH_MODE,
+                    default=current_batch_mode
+                ): vol.In(BATCH_MODES),
+                vol.Required(
+                    CONF_HTML_PARSER,
+                    default=current_html_parser
+                ): vol.In(HTML_PARSERS),
+                vol.Required(
+                    CONF_MAX_STALE_AGE,
+                    default=current_max_stale_age
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=MAX_MAX_STALE_AGE,
+                        step=15,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="phút",
+                    )
+                ),
+                vol.Required(
+                    CONF_HEDGE_PERCENTILE,
+                    default=current_hedge_percentile
+                ): vol.In(HEDGE_PERCENTILES),
             }),
             errors=errors,
             description_placeholders={
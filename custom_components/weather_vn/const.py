@@ -177,8 +177,125 @@ CONF_PROVINCE = "province"
 CONF_DISTRICT = "district"
 CONF_SCAN_INTERVAL = "scan_interval"
 DEFAULT_SCAN_INTERVAL = 30  # Thời gian cập nhật mặc định là 30 phút
+
+# Chế độ cập nhật theo lô: một bộ lập lịch cho mọi quận/huyện của một tỉnh hoặc vùng
+CONF_BATCH_MODE = "batch_mode"
+BATCH_MODE_OFF = "off"
+BATCH_MODE_PROVINCE = "province"
+BATCH_MODE_REGION = "region"
+BATCH_MODES = {
+    BATCH_MODE_OFF: "Tắt (mỗi quận/huyện tự cập nhật)",
+    BATCH_MODE_PROVINCE: "Theo tỉnh/thành phố",
+    BATCH_MODE_REGION: "Theo vùng miền",
+}
+DEFAULT_BATCH_MODE = BATCH_MODE_OFF
+BATCH_MAX_CONCURRENCY = 4  # Số quận/huyện được tải đồng thời trong một lượt
+DATA_BATCH_SCHEDULERS = f"{DOMAIN}_batch_schedulers"
+
+# Số worker phân tích HTML/JSON ngoài vòng lặp sự kiện (0 = phân tích ngay trên vòng lặp).
+# Nhóm phân tích dùng chung cho cả tích hợp nên đây là hằng số, không phải tùy chọn của từng mục
+PARSE_WORKERS = 2
+DATA_PARSE_EXECUTOR = f"{DOMAIN}_parse_executor"
+# Kiểu nhóm phân tích: luồng hoặc tiến trình để tận dụng nhiều lõi CPU (cũng dùng chung cả tích hợp)
+PARSE_BACKEND_THREAD = "thread"
+PARSE_BACKEND_PROCESS = "process"
+PARSE_BACKEND = PARSE_BACKEND_THREAD
+
+# Bộ phân tích HTML: tự chọn bộ nhanh nhất đã cài, hoặc cố định để tái lập kết quả
+CONF_HTML_PARSER = "html_parser"
+HTML_PARSER_AUTO = "auto"
+HTML_PARSER_SELECTOLAX = "selectolax"
+HTML_PARSER_LXML = "lxml"
+HTML_PARSER_HTMLPARSER = "html.parser"
+HTML_PARSERS = {
+    HTML_PARSER_AUTO: "Tự động (nhanh nhất hiện có)",
+    HTML_PARSER_SELECTOLAX: "selectolax",
+    HTML_PARSER_LXML: "lxml",
+    HTML_PARSER_HTMLPARSER: "html.parser (có sẵn trong Python)",
+}
+DEFAULT_HTML_PARSER = HTML_PARSER_AUTO
 ATTRIBUTION = "Dữ liệu được cung cấp bởi dbtt.edu.vn"
 
+# Phiên HTTP dùng chung cho mọi mục cấu hình
+DATA_HTTP_CLIENT = f"{DOMAIN}_http_client"
+HTTP_CONNECTION_LIMIT = 50  # Tổng số kết nối đồng thời
+HTTP_CONNECTION_LIMIT_PER_HOST = 8  # Số kết nối tối đa tới mỗi máy chủ
+HTTP_DNS_CACHE_TTL = 600  # Giây giữ kết quả phân giải DNS
+HTTP_KEEPALIVE_TIMEOUT = 300  # Giây giữ kết nối rảnh (máy chủ có thể đóng sớm hơn)
+
+# Các phần dữ liệu được làm mới độc lập với thời gian sống (giây) riêng.
+# Thời tiết hiện tại và dự báo giờ/ngày nằm chung một trang MSN nên làm mới mỗi lần cập nhật;
+# chỉ số đời sống chỉ mô tả hôm nay, AQI của dbtt thay đổi nhiều nhất mỗi giờ.
+SECTION_WEATHER = "weather"
+SECTION_AIR_QUALITY = "air_quality"
+SECTION_LIFE = "life"
+SECTION_TTLS = {
+    SECTION_WEATHER: 0,
+    SECTION_AIR_QUALITY: 60 * 60,
+    SECTION_LIFE: 3 * 60 * 60,
+}
+
+# Giới hạn tốc độ gửi yêu cầu theo máy chủ: (số yêu cầu mỗi giây, số yêu cầu dồn tối đa)
+RATE_LIMITS = {
+    "msn.com": (2.0, 4),
+    "dbtt.edu.vn": (1.0, 3),
+}
+
+# Tuổi tối đa (phút, tính từ lúc hết hạn) của giá trị cũ được dùng tạm khi làm mới thất bại
+CONF_MAX_STALE_AGE = "max_stale_age"
+DEFAULT_MAX_STALE_AGE = 180
+MAX_MAX_STALE_AGE = 1440
+# Chu kỳ thử lại (phút) khi dữ liệu thời tiết đang là giá trị cũ
+STALE_RETRY_INTERVAL = 5
+
+# Ảnh chụp dữ liệu tốt gần nhất lưu trên đĩa để khởi động nhanh
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_STORAGE_KEY = f"{DOMAIN}.snapshot"
+SNAPSHOT_SAVE_DELAY = 30  # giây, gộp các lần ghi liên tiếp
+# Khoảng (giây) rải lần làm mới từ mạng sau khi khởi động bằng ảnh chụp,
+# để các mục không cùng gửi yêu cầu ngay khi Home Assistant khởi động
+STARTUP_SPREAD = 120
+
+# Thời hạn (giây) cho toàn bộ một lần làm mới và cho từng nguồn dữ liệu
+REFRESH_DEADLINE = 60
+SOURCE_TIMEOUTS = {
+    SECTION_WEATHER: 20,
+    SECTION_LIFE: 20,
+    SECTION_AIR_QUALITY: 15,
+}
+# Gửi thêm một yêu cầu dự phòng tới MSN khi yêu cầu dự báo chậm hơn phân vị đã chọn
+CONF_HEDGE_PERCENTILE = "hedge_percentile"
+HEDGE_OFF = "off"
+HEDGE_PERCENTILES = {
+    HEDGE_OFF: "Tắt",
+    "p90": "p90",
+    "p95": "p95",
+    "p99": "p99",
+}
+DEFAULT_HEDGE_PERCENTILE = "p95"
+# Số mẫu tối thiểu trước khi dùng phân vị để gửi yêu cầu dự phòng, và số mẫu giữ lại
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# Ngắt mạch theo máy chủ nguồn: tên miền được theo dõi, số lỗi liên tiếp để ngắt,
+# thời gian chờ (giây) tăng theo cấp số nhân và số yêu cầu thử khi nửa mở
+CIRCUIT_BREAKER_HOSTS = ("msn.com", "dbtt.edu.vn")
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_BASE_BACKOFF = 60
+CIRCUIT_MAX_BACKOFF = 1800
+CIRCUIT_HALF_OPEN_PROBES = 1
+CIRCUIT_STATE_CLOSED = "closed"
+CIRCUIT_STATE_OPEN = "open"
+CIRCUIT_STATE_HALF_OPEN = "half_open"
+
+# Bộ nhớ đệm phản hồi dùng chung: thời gian sống (giây) theo tên miền và giới hạn kích thước
+RESPONSE_CACHE_TTLS = {
+    "msn.com": 120,
+    "dbtt.edu.vn": 600,
+}
+RESPONSE_CACHE_MAX_ENTRIES = 64
+RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
 # Bảng ánh xạ cứng cho các hoạt động đời sống do người dùng cung cấp
 ACTIVITY_MAP = {
     (1, 1): "Quần Áo",
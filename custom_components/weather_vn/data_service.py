@@ -1,14 +1,49 @@
 """Dịch vụ dữ liệu cho Weather Vn."""
 import asyncio
+from contextvars import ContextVar
+import datetime
+import hashlib
+from itertools import islice
 import json
 import logging
+import multiprocessing
+import operator
 import re
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable
 import aiohttp
-from bs4 import BeautifulSoup
 import urllib.parse
 
-from .const import _PROVINCES_DATA, ACTIVITY_MAP
+from .const import (
+    _PROVINCES_DATA,
+    ACTIVITY_MAP,
+    DEFAULT_MAX_STALE_AGE,
+    HEDGE_MIN_SAMPLES,
+    PARSE_BACKEND_PROCESS,
+    REFRESH_DEADLINE,
+    SECTION_AIR_QUALITY,
+    SECTION_LIFE,
+    SECTION_TTLS,
+    SECTION_WEATHER,
+    SOURCE_TIMEOUTS,
+)
+from .executor import WeatherVnParseExecutor
+from .html_parser import RESOLVED_HTML_PARSER, parse_html
+from .models import CurrentWeather, DailyForecast, HourlyColumns
+from .msn_fields import (
+    CURRENT_FIELD_MAP,
+    DAILY_FIELD_MAP,
+    HOURLY_FIELD_MAP,
+    parse_numeric,
+)
+from .network import (
+    CIRCUIT_BREAKERS,
+    LATENCY_TRACKER,
+    RATE_LIMITER,
+    RESPONSE_CACHE,
+    SINGLE_FLIGHT,
+    VALIDATOR_CACHE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,29 +53,521 @@ class WeatherVnDataError(Exception):
     pass
 
 
-def _parse_numeric(value, default=None):
+# Thẻ mở <script ... id="redux-data" ...> chứa trạng thái JSON của trang MSN
+_REDUX_OPEN_RE = re.compile(rb"""<script\b[^>]*\bid=["']?redux-data["']?[^>]*>""", re.IGNORECASE)
+_REDUX_OPEN_STR_RE = re.compile(r"""<script\b[^>]*\bid=["']?redux-data["']?[^>]*>""", re.IGNORECASE)
+_SCRIPT_CLOSE = b"</script"
+# Độ dài tối đa giả định của thẻ mở, phần đuôi này được giữ lại giữa hai khối dữ liệu
+_REDUX_TAG_MAX_LEN = 1024
+STREAM_CHUNK_SIZE = 16 * 1024
+# Nếu phần còn lại của trang nhỏ hơn ngưỡng này thì đọc nốt để giữ kết nối keep-alive
+STREAM_DRAIN_LIMIT = 64 * 1024
+
+# Thống kê đọc luồng trang MSN, dùng cho chẩn đoán
+STREAM_STATS = {
+    "pages": 0,
+    "bytes_read": 0,
+    "payload_bytes": 0,
+    "aborted_early": 0,
+    "dom_fallbacks": 0,
+}
+
+
+# Thống kê so sánh băm nội dung trước khi phân tích, dùng cho chẩn đoán
+HASH_STATS = {
+    "checked": 0,
+    "unchanged": 0,
+}
+
+
+# Thống kê yêu cầu dự phòng tới MSN, dùng cho chẩn đoán
+# Sự kiện báo yêu cầu của phần dữ liệu đang tải đã qua bộ giới hạn tốc độ; thời hạn
+# REFRESH_DEADLINE chỉ bắt đầu tính từ lúc này, không tính thời gian xếp hàng chờ lượt
+_REQUEST_ADMITTED: ContextVar[asyncio.Event | None] = ContextVar(
+    "weather_vn_request_admitted", default=None
+)
+
+HEDGE_STATS = {
+    "fired": 0,
+    "hedge_won": 0,
+    "deadline_exceeded": 0,
+}
+
+
+def _payload_digest(payload: bytes | str) -> bytes:
+    """Băm nhanh nội dung cần phân tích để nhận biết trang không đổi."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _extract_redux_payload(html: str, html_parser: str = RESOLVED_HTML_PARSER) -> str | None:
     """
-    Phân tích một cách an toàn một giá trị số từ một chuỗi có thể chứa các đơn vị,
-    hoặc trả về giá trị nếu nó đã là một số. Luôn trả về float.
+    Cắt nội dung thẻ script redux-data trực tiếp từ chuỗi HTML.
+
+    Chỉ dựng cây DOM (bằng bộ phân tích `html_parser`) khi cách tìm chuỗi không thành công.
+    """
+    idx = html.find("redux-data")
+    while idx >= 0:
+        tag_start = html.rfind("<", 0, idx)
+        match = _REDUX_OPEN_STR_RE.match(html, tag_start) if tag_start >= 0 else None
+        if match and match.end() > idx:
+            end = html.find("</script", match.end())
+            if end >= 0:
+                return html[match.end():end]
+        idx = html.find("redux-data", idx + 1)
+
+    STREAM_STATS["dom_fallbacks"] += 1
+    redux_script = parse_html(html, html_parser).select_one('script#redux-data')
+    return redux_script.text if redux_script else None
+
+
+class _ReduxStreamExtractor:
+    """Tìm nội dung thẻ script redux-data trong luồng HTML theo từng khối."""
+
+    def __init__(self, html_parser: str = RESOLVED_HTML_PARSER) -> None:
+        """Khởi tạo bộ đệm rỗng; `html_parser` dùng khi phải dựng cây DOM để dự phòng."""
+        self._html_parser = html_parser
+        self._buffer = bytearray()
+        self._started = False
+        self._keep_all = False
+        self._search_from = 0
+        self.bytes_seen = 0
+
+    def feed(self, chunk: bytes) -> bytes | None:
+        """Nạp một khối dữ liệu, trả về nội dung script khi đã gặp thẻ đóng."""
+        self.bytes_seen += len(chunk)
+        self._buffer += chunk
+        if not self._started:
+            match = _REDUX_OPEN_RE.search(self._buffer)
+            if match is None:
+                if self._keep_all or b"redux-data" in self._buffer:
+                    # Có dấu hiệu của thẻ nhưng mẫu nhanh chưa khớp: giữ lại để dự phòng
+                    self._keep_all = True
+                else:
+                    # Chỉ giữ phần đuôi phòng trường hợp thẻ mở bị cắt giữa hai khối
+                    del self._buffer[:-_REDUX_TAG_MAX_LEN]
+                return None
+            # Bỏ toàn bộ phần HTML phía trước, chỉ giữ nội dung script
+            del self._buffer[:match.end()]
+            self._started = True
+
+        end = self._buffer.find(_SCRIPT_CLOSE, self._search_from)
+        if end < 0:
+            self._search_from = max(0, len(self._buffer) - len(_SCRIPT_CLOSE))
+            return None
+        return bytes(self._buffer[:end])
+
+    def finish(self) -> bytes | None:
+        """Gọi khi hết luồng mà chưa thấy thẻ: thử phân tích phần trang đã giữ lại."""
+        if self._started or not self._keep_all:
+            return None
+        payload = _extract_redux_payload(
+            self._buffer.decode("utf-8", errors="replace"), self._html_parser
+        )
+        return payload.encode("utf-8") if payload is not None else None
+
+
+async def _read_redux_payload(
+    response: aiohttp.ClientResponse, html_parser: str = RESOLVED_HTML_PARSER
+) -> bytes | None:
+    """
+    Đọc luồng phản hồi MSN và chỉ giữ nội dung thẻ script redux-data.
+
+    Ngừng tải ngay khi gặp thẻ đóng; trả về None nếu trang không có thẻ này.
     """
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        match = re.search(r"^-?\d+\.?\d*", value)
-        if match:
-            return float(match.group())
-    if default is not None:
-        return float(default)
+    extractor = _ReduxStreamExtractor(html_parser)
+    STREAM_STATS["pages"] += 1
+    try:
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            payload = extractor.feed(chunk)
+            if payload is None:
+                continue
+            STREAM_STATS["payload_bytes"] += len(payload)
+            # Phần còn lại nhỏ thì đọc nốt để kết nối được dùng lại, lớn thì ngắt luôn
+            drained = 0
+            while drained <= STREAM_DRAIN_LIMIT:
+                rest = await response.content.read(STREAM_CHUNK_SIZE)
+                if not rest:
+                    break
+                drained += len(rest)
+            else:
+                STREAM_STATS["aborted_early"] += 1
+                response.close()
+            extractor.bytes_seen += drained
+            return payload
+        return extractor.finish()
+    finally:
+        STREAM_STATS["bytes_read"] += extractor.bytes_seen
+
+
+def _parse_msn_life_data(json_data: dict) -> dict:
+    """Phân tích dữ liệu JSON từ trang life của MSN."""
+    try:
+        life_activity_data = _lookup_key(json_data, 'lifeActivityData')
+        if not life_activity_data:
+            return {"activities": []}
+
+        days_data = life_activity_data.get('days')
+        if not days_data or not isinstance(days_data, list) or len(days_data) == 0:
+            return {"activities": []}
+
+        today_indices = days_data[0].get('lifeDailyIndices')
+        if not today_indices or not isinstance(today_indices, list):
+            return {"activities": []}
+
+        activities = []
+        for item in today_indices:
+            item_type = item.get("type")
+            item_sub_type = item.get("subType")
+            activity_name = ACTIVITY_MAP.get((item_type, item_sub_type))
+
+            if activity_name:
+                activities.append({
+                    "name": activity_name,
+                    "state": item.get("taskbarSummary"),
+                    "summary": item.get("summary"),
+                    "type": item_type,
+                    "subType": item_sub_type
+                })
+
+        return {"activities": activities}
+    except (KeyError, IndexError):
+        return {"activities": []}
+
+
+def _find_key_path(data, target_key, path: tuple = ()) -> tuple | None:
+    """Duyệt theo chiều sâu toàn bộ cây, trả về đường dẫn tới giá trị đầu tiên của khóa."""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == target_key and value is not None:
+                return path + (key,)
+            if isinstance(value, (dict, list)):
+                result = _find_key_path(value, target_key, path + (key,))
+                if result is not None:
+                    return result
+    elif isinstance(data, list):
+        for index, item in enumerate(data):
+            result = _find_key_path(item, target_key, path + (index,))
+            if result is not None:
+                return result
     return None
 
 
+def _compile_path(path: tuple) -> Callable[[Any], Any]:
+    """Biên dịch đường dẫn thành hàm truy cập trực tiếp, chi phí O(độ sâu)."""
+    getters = tuple(operator.itemgetter(step) for step in path)
+
+    def accessor(data):
+        for getter in getters:
+            data = getter(data)
+        return data
+
+    return accessor
+
+
+# Đường dẫn đã biết của các khóa phải tìm trong cây redux: khóa -> (đường dẫn, hàm truy cập)
+_KEY_PATH_CACHE: dict[str, tuple[tuple, Callable[[Any], Any]]] = {}
+KEY_PATH_STATS = {"hits": 0, "walks": 0}
+
+
+def _lookup_key(data, target_key):
+    """
+    Lấy giá trị của khóa qua đường dẫn đã lưu; chỉ duyệt toàn cây khi đường dẫn
+    chưa có hoặc không còn trỏ tới giá trị hợp lệ.
+    """
+    cached = _KEY_PATH_CACHE.get(target_key)
+    if cached is not None:
+        try:
+            value = cached[1](data)
+        except (KeyError, IndexError, TypeError):
+            value = None
+        if value is not None:
+            KEY_PATH_STATS["hits"] += 1
+            return value
+        _KEY_PATH_CACHE.pop(target_key, None)
+
+    KEY_PATH_STATS["walks"] += 1
+    path = _find_key_path(data, target_key)
+    if path is None:
+        return None
+    accessor = _compile_path(path)
+    _KEY_PATH_CACHE[target_key] = (path, accessor)
+    _LOGGER.debug("Đã lưu đường dẫn tới khóa %s: %s", target_key, path)
+    return accessor(data)
+
+
+# Ký tự cấu trúc JSON cần để định vị khóa: dấu nháy mở chuỗi và dấu ngoặc
+_JSON_STRUCT_RE = re.compile(r'["{}\[\]]')
+_JSON_COLON_RE = re.compile(r"\s*:\s*")
+_JSON_WS_RE = re.compile(r"\s*")
+_JSON_DECODER = json.JSONDecoder()
+
+# Các nhánh của cây redux mà trình phân tích thời tiết cần
+_MSN_WEATHER_PATHS = (("WeatherData", "_@STATE@_"),)
+
+DECODE_STATS = {"selective": 0, "full": 0}
+
+# Số ký tự tối đa được quét bằng Python để tìm một khóa. Quét chậm hơn json.loads (mã C)
+# nhiều lần, nên khi nhánh cần tìm nằm sau phần đầu lớn hơn mức này thì giải mã toàn bộ
+# (tốn bộ nhớ hơn nhưng nhanh hơn). Trang MSN thật có WeatherData ngay đầu cây redux.
+SELECTIVE_DECODE_MAX_SCAN = 64 * 1024
+
+
+def _string_end(text: str, start: int) -> int:
+    """
+    Vị trí ngay sau chuỗi JSON bắt đầu bằng dấu nháy tại `start`.
+
+    Nhảy thẳng tới dấu nháy kế tiếp bằng str.find thay vì duyệt từng ký tự,
+    chỉ kiểm tra số dấu gạch chéo ngược đứng trước để bỏ qua dấu nháy đã thoát.
+    """
+    end = text.find('"', start + 1)
+    while end >= 0:
+        backslash = end - 1
+        while text[backslash] == "\\":
+            backslash -= 1
+        # Số chẵn dấu gạch chéo ngược (end - backslash lẻ): dấu nháy đóng thật
+        if (end - backslash) % 2:
+            return end + 1
+        end = text.find('"', end + 1)
+    raise ValueError("Chuỗi JSON không có dấu nháy đóng")
+
+
+def _find_member(text: str, obj_start: int, key: str, limit: int) -> int:
+    """
+    Tìm khóa con trực tiếp của object JSON bắt đầu tại `obj_start` mà không dựng object.
+
+    Trả về vị trí bắt đầu giá trị của khóa, hoặc -1 nếu không có hay đã quét quá vị trí `limit`.
+    """
+    quoted = json.dumps(key)
+    search = _JSON_STRUCT_RE.search
+    depth = 0
+    pos = obj_start
+    while (match := search(text, pos)) is not None:
+        start = match.start()
+        if start > limit:
+            return -1
+        char = text[start]
+        if char == '"':
+            pos = _string_end(text, start)
+            if depth == 1 and pos - start == len(quoted) and text.startswith(quoted, start):
+                colon = _JSON_COLON_RE.match(text, pos)
+                if colon is not None and ":" in colon.group():
+                    return colon.end()
+            continue
+        pos = start + 1
+        if char in "{[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return -1
+    return -1
+
+
+def _decode_selected(
+    text: str, paths, max_scan: int = SELECTIVE_DECODE_MAX_SCAN
+) -> dict | None:
+    """
+    Chỉ giải mã các nhánh theo `paths`, bỏ qua phần còn lại của tài liệu.
+
+    Trả về cây rút gọn chỉ gồm các nhánh đó (cùng cấu trúc với json.loads),
+    hoặc None nếu một đường dẫn không định vị được trong `max_scan` ký tự đầu.
+    """
+    root = _JSON_WS_RE.match(text).end()
+    limit = root + max_scan
+    result: dict = {}
+    for path in paths:
+        pos = root
+        for key in path:
+            # Chỉ hỗ trợ đi qua các khóa object
+            if not isinstance(key, str) or text[pos:pos + 1] != "{":
+                return None
+            pos = _find_member(text, pos, key, limit)
+            if pos < 0:
+                return None
+        value, _ = _JSON_DECODER.raw_decode(text, pos)
+        node = result
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = value
+    return result
+
+
+def _decode_redux(payload: bytes | str, paths) -> dict:
+    """Giải mã có chọn lọc payload redux, dùng json.loads toàn bộ khi không định vị được."""
+    text = payload.decode("utf-8") if isinstance(payload, bytes) else payload
+    if paths:
+        try:
+            json_data = _decode_selected(text, paths)
+        except ValueError:
+            json_data = None
+        if json_data is not None:
+            DECODE_STATS["selective"] += 1
+            return json_data
+    DECODE_STATS["full"] += 1
+    return json.loads(text)
+
+
+def _decode_msn_weather(payload: bytes | str) -> dict:
+    """Giải mã JSON redux và phân tích dữ liệu thời tiết (chạy trong nhóm luồng hoặc tiến trình)."""
+    return _parse_msn_json(_decode_redux(payload, _MSN_WEATHER_PATHS))
+
+
+def _decode_msn_life_data(payload: bytes | str) -> dict:
+    """Giải mã JSON redux và phân tích dữ liệu hoạt động (chạy trong nhóm luồng hoặc tiến trình)."""
+    # Lần đầu giải mã toàn bộ để tìm đường dẫn; các lần sau chỉ giải mã nhánh đó
+    cached = _KEY_PATH_CACHE.get("lifeActivityData")
+    paths = (cached[0],) if cached is not None else ()
+    return _parse_msn_life_data(_decode_redux(payload, paths))
+
+
+def _parse_msn_json(json_data: dict) -> dict:
+    """Phân tích dữ liệu JSON từ MSN và ánh xạ sang cấu trúc mong muốn."""
+    weather_state = json_data.get("WeatherData", {}).get("_@STATE@_", {})
+
+    # --- Gom các nguồn dữ liệu thô ---
+    current_raw = weather_state.get("currentCondition", {})
+    forecast_days_raw = weather_state.get("forecast", [])
+    today_forecast_raw = forecast_days_raw[0] if forecast_days_raw else {}
+    hourly_forecast_raw = today_forecast_raw.get("hourly", []) if today_forecast_raw else []
+
+    # --- Dữ liệu thời tiết hiện tại ---
+    current_weather = CurrentWeather()
+    if current_raw:
+        current_weather = CurrentWeather(**CURRENT_FIELD_MAP.record({
+            "current": current_raw,
+            "first_hour": hourly_forecast_raw[0] if hourly_forecast_raw else {},
+            "next_hour": hourly_forecast_raw[1] if len(hourly_forecast_raw) > 1 else {},
+            "today": today_forecast_raw,
+            "nowcasting": weather_state.get("nowcasting", {}),
+        }))
+
+    # --- Dự báo hàng giờ (lưu theo cột) ---
+    # MSN trả về dự báo hàng giờ cho nhiều ngày, ta chỉ lấy 48 giờ đầu
+    hours = list(islice((hour for day in forecast_days_raw for hour in day.get("hourly", [])), 48))
+    hourly_forecast = HourlyColumns(**HOURLY_FIELD_MAP.columns(hours))
+
+    # --- Dự báo hàng ngày ---
+    daily_forecast = [DailyForecast(**item) for item in DAILY_FIELD_MAP.records(forecast_days_raw)]
+
+    return {
+        "current_weather": current_weather,
+        "hourly_forecast": hourly_forecast,
+        "daily_forecast": daily_forecast,
+    }
+
+
+def _parse_air_quality(
+    html_content: str, html_parser: str = RESOLVED_HTML_PARSER
+) -> dict[str, Any]:
+    """Phân tích dữ liệu chất lượng không khí từ HTML của dbtt.edu.vn."""
+    try:
+        root = parse_html(html_content, html_parser)
+        result = {}
+
+        air_quality_div = root.select_one('.air-quality')
+        if not air_quality_div:
+            return {}
+
+        level_div = air_quality_div.select_one('.air-quality-content')
+        if level_div:
+            for class_name in level_div.classes:
+                if class_name.startswith('air-'):
+                    result['level'] = class_name
+                    break
+
+            title_p = level_div.select_one('.title')
+            desc_p = level_div.select_one('.desc')
+            if title_p:
+                result['title'] = title_p.text.strip()
+            if desc_p:
+                result['description'] = desc_p.text.strip()
+
+        air_items = air_quality_div.select('.air-quality-item')
+        for item in air_items:
+            title_div = item.select_one('.title')
+            value_p = item.select_one('p')
+            if title_div and value_p:
+                title = title_div.stripped_text.lower()
+                value = parse_numeric(value_p.text.strip())
+                key_map = {
+                    'co': 'co', 'nh': 'nh3', 'no2': 'no2', 'no': 'no',
+                    'o3': 'o3', 'o₃': 'o3',
+                    'pm2.5': 'pm2_5', 'pm₂.₅': 'pm2_5',
+                    'pm10': 'pm10', 'pm₁₀': 'pm10',
+                    'so2': 'so2', 'so₂': 'so2'
+                }
+                for title_key, result_key in key_map.items():
+                    if title_key in title:
+                        result[result_key] = value
+                        break
+        return result
+    except Exception as e:
+        _LOGGER.debug("Lỗi khi phân tích dữ liệu AQI từ dbtt: %s", e)
+        return {}
+
+
+# Bộ đếm được tăng bên trong các hàm phân tích (có thể chạy trong tiến trình con)
+_WORKER_STATS = (KEY_PATH_STATS, DECODE_STATS, STREAM_STATS)
+
+
+def _run_counted(func: Callable[..., Any], *args: Any) -> tuple[Any, list[dict] | None]:
+    """
+    Chạy hàm phân tích và trả về kèm mức tăng của các bộ đếm trong tiến trình con.
+
+    Nếu đang chạy ngay trong tiến trình chính (nhóm tiến trình đã chuyển về nhóm luồng),
+    bộ đếm đã được tăng trực tiếp nên không trả về mức tăng để tránh đếm hai lần.
+    """
+    if multiprocessing.parent_process() is None:
+        return func(*args), None
+    before = [dict(stats) for stats in _WORKER_STATS]
+    result = func(*args)
+    deltas = [
+        {key: value - old.get(key, 0) for key, value in stats.items() if value != old.get(key, 0)}
+        for stats, old in zip(_WORKER_STATS, before)
+    ]
+    return result, deltas
+
+
 class WeatherVnDataService:
     """Dịch vụ dữ liệu thời tiết từ dbtt.edu.vn."""
 
-    def __init__(self, province: str, district: str):
-        """Khởi tạo dịch vụ với tỉnh và huyện."""
+    def __init__(
+        self,
+        province: str,
+        district: str,
+        session: aiohttp.ClientSession | None = None,
+        parse_executor: WeatherVnParseExecutor | None = None,
+        html_parser: str = RESOLVED_HTML_PARSER,
+        max_stale_age: float = DEFAULT_MAX_STALE_AGE * 60,
+        hedge_percentile: int | None = None,
+    ):
+        """Khởi tạo dịch vụ với tỉnh và huyện.
+
+        Nếu truyền vào `session` (phiên dùng chung), các kết nối keep-alive sẽ được
+        dùng lại giữa các lần cập nhật thay vì bắt tay DNS/TCP/TLS lại mỗi lần.
+        Nếu truyền vào `parse_executor`, việc phân tích HTML/JSON chạy ngoài vòng lặp sự kiện.
+        `html_parser` là bộ phân tích HTML đã chọn (xem html_parser.select_backend).
+        `max_stale_age` (giây) là thời gian tối đa sau khi hết hạn mà giá trị cũ
+        của một phần còn được dùng tạm khi làm mới thất bại.
+        `hedge_percentile` (ví dụ 95): khi yêu cầu dự báo MSN chậm hơn phân vị này,
+        một yêu cầu dự phòng được gửi và kết quả tốt đến trước được dùng; None để tắt.
+        """
         self.province = province
         self.district = district
+        self._session = session
+        self._parse_executor = parse_executor
+        self._html_parser = html_parser
+        self._max_stale_age = max_stale_age
+        self._hedge_percentile = hedge_percentile
+        # Giá trị tốt gần nhất của từng phần dữ liệu: phần -> (thời điểm tải, giá trị)
+        self._sections: dict[str, tuple[float, Any]] = {}
+        # Thời điểm (UTC) tải thành công gần nhất và các phần đang dùng giá trị cũ
+        self._fetched_at: dict[str, datetime.datetime] = {}
+        self.stale_sections: set[str] = set()
+        # Băm nội dung và kết quả phân tích gần nhất của từng phần: phần -> (băm, kết quả)
+        self._payload_digests: dict[str, tuple[bytes, Any]] = {}
         self.msn_url = self._build_msn_url()
         self.dbtt_url = f"https://dbtt.edu.vn/thoi-tiet-{province}/{district}"
 
@@ -63,64 +590,290 @@ class WeatherVnDataService:
 
     async def get_data(self) -> dict[str, Any]:
         """
-        Lấy dữ liệu từ cả hai nguồn. Ném ra WeatherVnDataError nếu nguồn dữ liệu
-        quan trọng (MSN) thất bại.
+        Lấy dữ liệu của các phần đã hết hạn và giữ giá trị gần nhất của các phần còn hạn.
+        Phần nào làm mới thất bại thì dùng tạm giá trị cũ (đánh dấu là cũ) trong giới hạn tuổi tối đa.
+        Ném ra WeatherVnDataError nếu nguồn dữ liệu quan trọng (MSN) thất bại và không còn giá trị cũ.
         """
-        async with aiohttp.ClientSession() as session:
-            # Sử dụng asyncio.gather để thực hiện các yêu cầu mạng đồng thời
-            results = await asyncio.gather(
-                self._fetch_msn_weather(session),
-                self._fetch_dbtt_aqi(session),
-                self._fetch_msn_life_data(session),  # Thêm tác vụ mới
-                return_exceptions=True,  # Trả về exception thay vì ném ra ngay lập tức
-            )
-
-        msn_data, aqi_data, life_data = results
-
-        # Xử lý kết quả từ MSN
-        if isinstance(msn_data, Exception):
-            _LOGGER.debug("Không thể lấy dữ liệu thời tiết từ MSN. Lỗi: %s", msn_data)
-            # Nếu MSN lỗi, chúng ta không thể tiếp tục
-            raise WeatherVnDataError("Lỗi khi lấy dữ liệu thời tiết từ MSN") from msn_data
-
-        # Xử lý kết quả từ DBTT
-        if isinstance(aqi_data, Exception):
-            _LOGGER.debug(
-                "Không thể lấy dữ liệu AQI từ dbtt.edu.vn, sẽ bỏ qua: %s", aqi_data
-            )
-            aqi_data = {}  # Sử dụng dữ liệu AQI rỗng
-
-        # Xử lý kết quả từ MSN Life
-        if isinstance(life_data, Exception):
-            _LOGGER.debug("Không thể lấy dữ liệu hoạt động từ MSN, sẽ bỏ qua: %s", life_data)
-            life_data = {"activities": []}  # Sử dụng dữ liệu rỗng
+        now = time.monotonic()
+        due = [section for section in SECTION_TTLS if self._is_section_due(section, now)]
+        _LOGGER.debug("Các phần dữ liệu cần làm mới: %s", due)
+
+        if self._session is not None:
+            results = await self._fetch_sections(self._session, due)
+        else:
+            # Không có phiên dùng chung (ví dụ khi chạy độc lập), tạo phiên tạm thời
+            async with aiohttp.ClientSession() as session:
+                results = await self._fetch_sections(session, due)
+
+        for section, result in zip(due, results):
+            failed = isinstance(result, Exception)
+            if not failed and any(result.values()):
+                self._sections[section] = (now, result)
+                self._fetched_at[section] = datetime.datetime.now(datetime.timezone.utc)
+                self.stale_sections.discard(section)
+                continue
+            # AQI và life trả về dữ liệu rỗng khi lỗi, MSN ném lỗi: dùng tạm giá trị cũ nếu còn
+            if self._keep_stale(section, now):
+                _LOGGER.debug(
+                    "Không thể làm mới phần %s, dùng tạm giá trị cũ: %s",
+                    section, result if failed else "dữ liệu rỗng",
+                )
+                continue
+            if failed and section == SECTION_WEATHER:
+                _LOGGER.debug("Không thể lấy dữ liệu thời tiết từ MSN. Lỗi: %s", result)
+                # Nếu MSN lỗi và không còn giá trị cũ dùng được, chúng ta không thể tiếp tục
+                raise WeatherVnDataError("Lỗi khi lấy dữ liệu thời tiết từ MSN") from result
+            _LOGGER.debug("Không thể lấy phần %s: %s", section, result if failed else "dữ liệu rỗng")
 
         # Kết hợp dữ liệu
         combined_data = {
-            **msn_data,
-            "air_quality": aqi_data,
-            **life_data,  # Thêm dữ liệu hoạt động
+            **self._section_value(SECTION_WEATHER, {}),
+            "air_quality": self._section_value(SECTION_AIR_QUALITY, {}),
+            **self._section_value(SECTION_LIFE, {"activities": []}),
+            # Đưa vào dữ liệu để thực thể được cập nhật khi một phần chuyển sang/khỏi trạng thái cũ
+            "stale_sections": sorted(self.stale_sections),
         }
 
         _LOGGER.debug("Đã cập nhật dữ liệu tổng hợp thành công")
         return combined_data
 
+    def _is_section_due(self, section: str, now: float) -> bool:
+        """Kiểm tra một phần dữ liệu đã hết thời gian sống chưa."""
+        cached = self._sections.get(section)
+        return cached is None or now - cached[0] >= SECTION_TTLS[section]
+
+    def _keep_stale(self, section: str, now: float) -> bool:
+        """
+        Đánh dấu phần dữ liệu là cũ nếu giá trị gần nhất chưa quá tuổi tối đa.
+
+        Nếu đã quá tuổi tối đa, giá trị cũ bị bỏ và trả về False.
+        """
+        cached = self._sections.get(section)
+        if cached is not None and now - cached[0] <= SECTION_TTLS[section] + self._max_stale_age:
+            self.stale_sections.add(section)
+            return True
+        self._sections.pop(section, None)
+        self._fetched_at.pop(section, None)
+        self.stale_sections.discard(section)
+        return False
+
+    def section_status(self, section: str) -> dict[str, Any]:
+        """Thời điểm tải thành công gần nhất và trạng thái cũ của một phần dữ liệu."""
+        fetched_at = self._fetched_at.get(section)
+        if fetched_at is None:
+            return {}
+        return {
+            "fetched_at": fetched_at.isoformat(),
+            "stale": section in self.stale_sections,
+        }
+
+    def _section_value(self, section: str, default: Any) -> Any:
+        """Trả về giá trị tốt gần nhất của một phần dữ liệu."""
+        cached = self._sections.get(section)
+        return cached[1] if cached is not None else default
+
+    async def _run_parse(self, func, *args) -> Any:
+        """Chạy một bước phân tích qua nhóm luồng hoặc tiến trình (nếu có)."""
+        if self._parse_executor is None:
+            return func(*args)
+        if self._parse_executor.active_backend != PARSE_BACKEND_PROCESS:
+            return await self._parse_executor.run(func, *args)
+        # Bộ đếm tăng trong tiến trình con không hiện ra ở đây: nhận lại mức tăng rồi cộng vào
+        result, deltas = await self._parse_executor.run(_run_counted, func, *args)
+        if deltas is not None:
+            for stats, delta in zip(_WORKER_STATS, deltas):
+                for key, value in delta.items():
+                    stats[key] += value
+        return result
+
+    async def _parse_if_changed(
+        self, section: str, payload: bytes | str, func: Callable[..., Any], *args: Any
+    ) -> Any:
+        """
+        Phân tích `payload` bằng `func`, trừ khi nội dung giống hệt lần trước.
+
+        Khi băm trùng, trả về đúng đối tượng kết quả cũ để coordinator
+        nhận ra dữ liệu không đổi và không ghi trạng thái mới cho thực thể.
+        """
+        digest = _payload_digest(payload)
+        HASH_STATS["checked"] += 1
+        previous = self._payload_digests.get(section)
+        if previous is not None and previous[0] == digest:
+            HASH_STATS["unchanged"] += 1
+            _LOGGER.debug("Nội dung phần %s không đổi, bỏ qua bước phân tích", section)
+            return previous[1]
+        result = await self._run_parse(func, payload, *args)
+        if any(result.values()):
+            self._payload_digests[section] = (digest, result)
+        return result
+
+    async def _conditional_get(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable[bytes | str | None]],
+        parse: Callable[[bytes | str | None], Awaitable[dict[str, Any]]],
+        source: str,
+        headers: dict[str, str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Lấy và phân tích nội dung của `url`, ưu tiên bộ nhớ đệm phản hồi dùng chung.
+
+        Khi không có trong bộ nhớ đệm, gửi GET có điều kiện (If-None-Match/If-Modified-Since);
+        nếu máy chủ trả 304 thì dùng lại kết quả đã phân tích lần trước.
+        `read` lấy nội dung cần phân tích từ phản hồi, `parse` phân tích nội dung đó.
+        `source` là phần dữ liệu, dùng để chọn thời hạn và ghi lại thời gian tải.
+        """
+        payload = RESPONSE_CACHE.get(url)
+        if payload is not None:
+            _LOGGER.debug("Dùng nội dung trong bộ nhớ đệm cho %s", url)
+            return await parse(payload)
+
+        request_headers = {**(headers or {}), **VALIDATOR_CACHE.request_headers(url)}
+        # Máy chủ đang bị ngắt mạch thì CircuitOpenError được ném ra ngay, không gửi yêu cầu
+        async with CIRCUIT_BREAKERS.guard(url):
+            await RATE_LIMITER.acquire(url)
+            if (admitted := _REQUEST_ADMITTED.get()) is not None:
+                admitted.set()
+            start = time.monotonic()
+            async with session.get(
+                url,
+                headers=request_headers,
+                timeout=aiohttp.ClientTimeout(total=SOURCE_TIMEOUTS[source]),
+            ) as response:
+                if response.status == 304:
+                    cached = VALIDATOR_CACHE.reuse(url)
+                    if cached is None:
+                        raise WeatherVnDataError(f"Nhận 304 nhưng không có dữ liệu đã lưu cho {url}")
+                    _LOGGER.debug("Trang không đổi (304), dùng lại kết quả đã phân tích: %s", url)
+                    LATENCY_TRACKER.record(source, time.monotonic() - start)
+                    return cached
+                response.raise_for_status()
+                payload = await read(response)
+                response_headers = response.headers
+                size = response.content_length or len(payload or "")
+            LATENCY_TRACKER.record(source, time.monotonic() - start)
+
+        result = await parse(payload)
+        # Kết quả rỗng (lỗi phân tích) không được lưu để lần sau tải lại đầy đủ
+        if payload is not None and any(result.values()):
+            RESPONSE_CACHE.put(url, payload)
+            VALIDATOR_CACHE.store(url, response_headers, result, size)
+        return result
+
+    async def _fetch_sections(
+        self, session: aiohttp.ClientSession, sections: list[str]
+    ) -> list[Any]:
+        """Tải đồng thời các phần dữ liệu được yêu cầu."""
+        fetchers = {
+            SECTION_WEATHER: self._fetch_msn_weather,
+            SECTION_AIR_QUALITY: self._fetch_dbtt_aqi,
+            SECTION_LIFE: self._fetch_msn_life_data,
+        }
+        # Sử dụng asyncio.gather để thực hiện các yêu cầu mạng đồng thời;
+        # mỗi phần bị giới hạn bởi thời hạn chung để một nguồn treo không giữ cả lần làm mới
+        return await asyncio.gather(
+            *(self._with_deadline(section, fetchers[section](session)) for section in sections),
+            return_exceptions=True,  # Trả về exception thay vì ném ra ngay lập tức
+        )
+
+    async def _with_deadline(self, section: str, fetch: Awaitable[Any]) -> Any:
+        """
+        Chờ một phần dữ liệu trong thời hạn chung của lần làm mới.
+
+        Thời hạn tính từ lúc yêu cầu qua bộ giới hạn tốc độ, để thời gian xếp hàng khi nhiều
+        mục cùng tải không bị tính là máy chủ chậm. Việc chờ lượt cũng bị giới hạn bởi cùng
+        thời hạn; lần tải dùng chung với lần khác đang chạy (không tự qua bộ giới hạn)
+        thì vẫn tính thời hạn từ đầu như trước.
+        """
+        admitted = asyncio.Event()
+        token = _REQUEST_ADMITTED.set(admitted)
+        try:
+            # Tác vụ sao chép ngữ cảnh lúc tạo nên mang theo sự kiện của riêng phần này
+            task = asyncio.ensure_future(fetch)
+        finally:
+            _REQUEST_ADMITTED.reset(token)
+        waiter = asyncio.ensure_future(admitted.wait())
+        try:
+            await asyncio.wait(
+                (task, waiter), timeout=REFRESH_DEADLINE, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not task.done() and not admitted.is_set():
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(task, REFRESH_DEADLINE)
+        except asyncio.TimeoutError as err:
+            HEDGE_STATS["deadline_exceeded"] += 1
+            raise WeatherVnDataError(
+                f"Phần {section} vượt quá thời hạn {REFRESH_DEADLINE} giây"
+            ) from err
+        finally:
+            waiter.cancel()
+            task.cancel()
+
     async def _fetch_msn_weather(self, session: aiohttp.ClientSession) -> dict[str, Any]:
+        """Lấy dữ liệu thời tiết MSN, dùng chung với lần tải đang chạy của chính mục này."""
+        return await SINGLE_FLIGHT.run(
+            self.msn_url, lambda: self._fetch_msn_weather_hedged(session)
+        )
+
+    async def _fetch_msn_weather_hedged(self, session: aiohttp.ClientSession) -> dict[str, Any]:
+        """
+        Lấy dữ liệu thời tiết MSN, gửi thêm một yêu cầu dự phòng nếu yêu cầu đầu chậm.
+
+        Yêu cầu dự phòng chỉ được gửi khi đã có đủ mẫu thời gian tải để tính phân vị;
+        kết quả tốt đến trước được dùng, yêu cầu còn lại bị hủy.
+        """
+        delay = None
+        if (
+            self._hedge_percentile is not None
+            and LATENCY_TRACKER.count(SECTION_WEATHER) >= HEDGE_MIN_SAMPLES
+        ):
+            delay = LATENCY_TRACKER.percentile(SECTION_WEATHER, self._hedge_percentile)
+        if delay is None:
+            return await self._do_fetch_msn_weather(session)
+
+        primary = asyncio.ensure_future(self._do_fetch_msn_weather(session))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        HEDGE_STATS["fired"] += 1
+        _LOGGER.debug("Yêu cầu MSN chậm hơn %.2f giây, gửi yêu cầu dự phòng", delay)
+        hedge = asyncio.ensure_future(self._do_fetch_msn_weather(session))
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            HEDGE_STATS["hedge_won"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _read_redux(self, response: aiohttp.ClientResponse) -> bytes | None:
+        """Đọc nội dung redux-data, dựng cây DOM dự phòng bằng bộ phân tích HTML đã chọn."""
+        return await _read_redux_payload(response, self._html_parser)
+
+    async def _do_fetch_msn_weather(self, session: aiohttp.ClientSession) -> dict[str, Any]:
         """Lấy và phân tích dữ liệu thời tiết từ MSN."""
         _LOGGER.debug(f"Đang tải dữ liệu thời tiết từ MSN: {self.msn_url}")
-        try:
-            async with session.get(self.msn_url) as response:
-                response.raise_for_status()
-                html_content = await response.text()
 
-                soup = BeautifulSoup(html_content, 'html.parser')
-                redux_script = soup.find('script', {'id': 'redux-data'})
-                if not redux_script:
-                    raise WeatherVnDataError("Không tìm thấy thẻ script 'redux-data' trong HTML của MSN")
-
-                json_data = json.loads(redux_script.string)
-                return self._parse_msn_json(json_data)
+        async def parse(payload: bytes | None) -> dict[str, Any]:
+            """Phân tích nội dung redux-data của trang dự báo."""
+            if payload is None:
+                raise WeatherVnDataError("Không tìm thấy thẻ script 'redux-data' trong HTML của MSN")
+            return await self._parse_if_changed(SECTION_WEATHER, payload, _decode_msn_weather)
 
+        try:
+            return await self._conditional_get(
+                session, self.msn_url, self._read_redux, parse, SECTION_WEATHER
+            )
         except aiohttp.ClientResponseError as http_err:
             _LOGGER.debug("Lỗi HTTP khi tải dữ liệu MSN: %s, url='%s'", http_err.status, http_err.request_info.url)
             raise WeatherVnDataError(f"Lỗi HTTP {http_err.status}") from http_err
@@ -129,8 +882,16 @@ class WeatherVnDataService:
             raise WeatherVnDataError("Lỗi không xác định") from e
 
     async def _fetch_msn_life_data(self, session: aiohttp.ClientSession) -> dict[str, Any]:
-        """Lấy và phân tích dữ liệu hoạt động đời sống từ MSN."""
+        """Lấy dữ liệu hoạt động MSN, dùng chung với lần tải đang chạy của chính mục này."""
         life_url = self._build_msn_life_url()
+        return await SINGLE_FLIGHT.run(
+            life_url, lambda: self._do_fetch_msn_life_data(session, life_url)
+        )
+
+    async def _do_fetch_msn_life_data(
+        self, session: aiohttp.ClientSession, life_url: str
+    ) -> dict[str, Any]:
+        """Lấy và phân tích dữ liệu hoạt động đời sống từ MSN."""
         _LOGGER.debug(f"Đang tải dữ liệu hoạt động từ MSN: {life_url}")
         headers = {
             'User-Agent': (
@@ -139,229 +900,56 @@ class WeatherVnDataService:
                 'Chrome/91.0.4472.124 Safari/537.36'
             )
         }
-        try:
-            async with session.get(life_url, headers=headers) as response:
-                response.raise_for_status()
-                html_content = await response.text()
 
-                soup = BeautifulSoup(html_content, 'html.parser')
-                redux_script = soup.find('script', {'id': 'redux-data'})
-                if not redux_script:
-                    _LOGGER.debug("Không tìm thấy thẻ script 'redux-data' trong trang life của MSN")
-                    return {"activities": []}
+        async def parse(payload: bytes | None) -> dict[str, Any]:
+            """Phân tích nội dung redux-data của trang life."""
+            if payload is None:
+                _LOGGER.debug("Không tìm thấy thẻ script 'redux-data' trong trang life của MSN")
+                return {"activities": []}
+            return await self._parse_if_changed(SECTION_LIFE, payload, _decode_msn_life_data)
 
-                json_data = json.loads(redux_script.string)
-                return self._parse_msn_life_data(json_data)
+        try:
+            return await self._conditional_get(
+                session, life_url, self._read_redux, parse, SECTION_LIFE, headers
+            )
         except Exception as e:
             _LOGGER.debug(f"Lỗi khi tải hoặc phân tích dữ liệu hoạt động từ MSN: {e}")
             return {"activities": []}  # Không ném lỗi, chỉ trả về rỗng
 
-    def _parse_msn_life_data(self, json_data: dict) -> dict:
-        """Phân tích dữ liệu JSON từ trang life của MSN."""
-        try:
-            life_activity_data = self._find_key_recursively(json_data, 'lifeActivityData')
-            if not life_activity_data:
-                return {"activities": []}
-
-            days_data = life_activity_data.get('days')
-            if not days_data or not isinstance(days_data, list) or len(days_data) == 0:
-                return {"activities": []}
-
-            today_indices = days_data[0].get('lifeDailyIndices')
-            if not today_indices or not isinstance(today_indices, list):
-                return {"activities": []}
-
-            activities = []
-            for item in today_indices:
-                item_type = item.get("type")
-                item_sub_type = item.get("subType")
-                activity_name = ACTIVITY_MAP.get((item_type, item_sub_type))
-
-                if activity_name:
-                    activities.append({
-                        "name": activity_name,
-                        "state": item.get("taskbarSummary"),
-                        "summary": item.get("summary"),
-                        "type": item_type,
-                        "subType": item_sub_type
-                    })
-
-            return {"activities": activities}
-        except (KeyError, IndexError):
-            return {"activities": []}
-
-    def _find_key_recursively(self, data, target_key):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if key == target_key:
-                    return value
-                elif isinstance(value, (dict, list)):
-                    result = self._find_key_recursively(value, target_key)
-                    if result is not None:
-                        return result
-        elif isinstance(data, list):
-            for item in data:
-                result = self._find_key_recursively(item, target_key)
-                if result is not None:
-                    return result
-        return None
+    async def _fetch_dbtt_aqi(self, session: aiohttp.ClientSession) -> dict[str, Any]:
+        """Lấy dữ liệu AQI từ dbtt, dùng chung với lần tải đang chạy của chính mục này."""
+        return await SINGLE_FLIGHT.run(
+            self.dbtt_url, lambda: self._do_fetch_dbtt_aqi(session)
+        )
 
-    def _parse_msn_json(self, json_data: dict) -> dict:
-        """Phân tích dữ liệu JSON từ MSN và ánh xạ sang cấu trúc mong muốn."""
-        weather_state = json_data.get("WeatherData", {}).get("_@STATE@_", {})
-
-        # --- Gom các nguồn dữ liệu thô ---
-        current_raw = weather_state.get("currentCondition", {})
-        forecast_days_raw = weather_state.get("forecast", [])
-        today_forecast_raw = forecast_days_raw[0] if forecast_days_raw else {}
-        hourly_forecast_raw = today_forecast_raw.get("hourly", []) if today_forecast_raw else []
-        first_hour_raw = hourly_forecast_raw[0] if hourly_forecast_raw else {}
-
-        # Lấy xác suất mưa của giờ tiếp theo
-        next_hour_precip_prob = 0.0
-        precipitation_next_hour_amount = 0.0
-        precipitation_next_hour_accumulation = 0.0
-        if len(hourly_forecast_raw) > 1:
-            next_hour_forecast = hourly_forecast_raw[1]
-            next_hour_precip_prob = _parse_numeric(next_hour_forecast.get("precipitation"), default=0)
-            precipitation_next_hour_amount = _parse_numeric(next_hour_forecast.get("rainAmount"), default=0) * 10
-            precipitation_next_hour_accumulation = _parse_numeric(next_hour_forecast.get("raAccu"), default=0) * 10
-
-        # --- Dữ liệu thời tiết hiện tại ---
-        current_weather = {}
-        if current_raw:
-            current_weather = {
-                "temperature": _parse_numeric(current_raw.get("currentTemperature")),
-                "apparent_temperature": _parse_numeric(current_raw.get("feels")),
-                "condition": current_raw.get("shortCap"),
-                "humidity": _parse_numeric(current_raw.get("humidity")),
-                "wind_speed": _parse_numeric(current_raw.get("windSpeed"), default=0) / 3.6,
-                "wind_gust": _parse_numeric(current_raw.get("windGust")),
-                "dew_point": _parse_numeric(current_raw.get("dewPoint")),
-                "uv": _parse_numeric(current_raw.get("uv")),
-                "pressure": _parse_numeric(current_raw.get("baro")),
-                "visibility": _parse_numeric(current_raw.get("visiblity")),
-                "precipitation_amount": _parse_numeric(first_hour_raw.get("rainAmount"), default=0) * 10,
-                "precipitation_accumulation": _parse_numeric(first_hour_raw.get("raAccu"), default=0) * 10,
-                "precipitation_probability": next_hour_precip_prob,
-                "precipitation_next_hour_amount": precipitation_next_hour_amount,
-                "precipitation_next_hour_accumulation": precipitation_next_hour_accumulation,
-                "sunrise": today_forecast_raw.get("almanac", {}).get("sunrise", "").split("T")[-1],
-                "sunset": today_forecast_raw.get("almanac", {}).get("sunset", "").split("T")[-1],
-                "temp_low": _parse_numeric(today_forecast_raw.get("lowTemp")),
-                "temp_high": _parse_numeric(today_forecast_raw.get("highTemp")),
-                "precipitation_today": _parse_numeric(today_forecast_raw.get("raToMN"), default=0) * 10,
-                "rain_forecast": weather_state.get("nowcasting", {}).get("summary"),
-            }
-
-        # --- Dự báo hàng giờ ---
-        hourly_forecast = []
-        # MSN trả về dự báo hàng giờ cho nhiều ngày, ta chỉ lấy 48 giờ đầu
-        hour_count = 0
-        for day in forecast_days_raw:
-            if hour_count >= 48:
-                break
-            for hour in day.get("hourly", []):
-                if hour_count >= 48:
-                    break
+    async def _do_fetch_dbtt_aqi(self, session: aiohttp.ClientSession) -> dict[str, Any]:
+        """Lấy và phân tích dữ liệu chất lượng không khí từ dbtt.edu.vn."""
+        _LOGGER.debug(f"Đang tải dữ liệu AQI từ dbtt: {self.dbtt_url}")
 
-                hourly_item = {
-                    "datetime": hour.get("timeStr"),
-                    "temperature": _parse_numeric(hour.get("temperature")),
-                    "apparent_temperature": _parse_numeric(hour.get("feels")),
-                    "humidity": _parse_numeric(hour.get("humidity")),
-                    "condition": hour.get("cap"),
-                    "precipitation_probability": _parse_numeric(hour.get("precipitation"), default=0),
-                    "wind_speed": _parse_numeric(hour.get("windSpeed"), default=0) / 3.6,  # km/h -> m/s
-                }
-                hourly_forecast.append(hourly_item)
-                hour_count += 1
-
-        # --- Dự báo hàng ngày ---
-        daily_forecast = []
-        for day in forecast_days_raw:
-            daily_item = {
-                "datetime": day.get("almanac", {}).get("valid", "").split("T")[0],
-                "condition": day.get("dayCap"),
-                "temp_high": _parse_numeric(day.get("highTemp")),
-                "temp_low": _parse_numeric(day.get("lowTemp")),
-                "precipitation_probability": _parse_numeric(day.get("day", {}).get("precipitation"), default=0),
-                "precipitation": _parse_numeric(day.get("raToMN"), default=0) * 10,  # Lấy raToMN (cm) và đổi sang mm
-                "humidity": _parse_numeric(day.get("day", {}).get("humidity")),
-                "wind_speed": _parse_numeric(day.get("windSpeed"), default=0) / 3.6,  # km/h -> m/s
-                "sunrise": day.get("almanac", {}).get("sunrise", "").split("T")[-1],
-                "sunset": day.get("almanac", {}).get("sunset", "").split("T")[-1],
-            }
-            daily_forecast.append(daily_item)
+        async def read(response: aiohttp.ClientResponse) -> str:
+            """Đọc toàn bộ trang AQI."""
+            return await response.text()
 
-        return {
-            "current_weather": current_weather,
-            "hourly_forecast": hourly_forecast,
-            "daily_forecast": daily_forecast,
-        }
+        async def parse(html_content: str) -> dict[str, Any]:
+            """Phân tích trang AQI."""
+            return await self._parse_if_changed(
+                SECTION_AIR_QUALITY, html_content, _parse_air_quality, self._html_parser
+            )
 
-    async def _fetch_dbtt_aqi(self, session: aiohttp.ClientSession) -> dict[str, Any]:
-        """Lấy và phân tích dữ liệu chất lượng không khí từ dbtt.edu.vn."""
-        _LOGGER.debug(f"Đang tải dữ liệu AQI từ dbtt: {self.dbtt_url}")
         try:
-            async with session.get(self.dbtt_url) as response:
-                response.raise_for_status()
-                html_content = await response.text()
-                parsed_aqi = await self.parse_air_quality(html_content)
-                _LOGGER.debug("Dữ liệu AQI đã phân tích từ dbtt: %s", parsed_aqi)
-                return parsed_aqi
+            parsed_aqi = await self._conditional_get(
+                session, self.dbtt_url, read, parse, SECTION_AIR_QUALITY
+            )
+            _LOGGER.debug("Dữ liệu AQI đã phân tích từ dbtt: %s", parsed_aqi)
+            return parsed_aqi
         except Exception as e:
             # Lỗi này không nghiêm trọng, chỉ ghi lại cảnh báo
             _LOGGER.debug("Lỗi khi tải dữ liệu AQI từ dbtt: %s", e)
             return {}
 
-    async def parse_air_quality(self, html_content: str) -> dict[str, Any]:
+    def parse_air_quality(self, html_content: str) -> dict[str, Any]:
         """Phân tích dữ liệu chất lượng không khí từ HTML của dbtt.edu.vn."""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            result = {}
-
-            air_quality_div = soup.select_one('.air-quality')
-            if not air_quality_div:
-                return {}
-
-            level_div = air_quality_div.select_one('.air-quality-content')
-            if level_div:
-                classes = level_div.get('class', [])
-                for class_name in classes:
-                    if class_name.startswith('air-'):
-                        result['level'] = class_name
-                        break
-
-                title_p = level_div.select_one('.title')
-                desc_p = level_div.select_one('.desc')
-                if title_p:
-                    result['title'] = title_p.text.strip()
-                if desc_p:
-                    result['description'] = desc_p.text.strip()
-
-            air_items = air_quality_div.select('.air-quality-item')
-            for item in air_items:
-                title_div = item.select_one('.title')
-                value_p = item.select_one('p')
-                if title_div and value_p:
-                    title = ''.join(title_div.stripped_strings).lower()
-                    value = _parse_numeric(value_p.text.strip())
-                    key_map = {
-                        'co': 'co', 'nh': 'nh3', 'no2': 'no2', 'no': 'no',
-                        'o3': 'o3', 'o₃': 'o3',
-                        'pm2.5': 'pm2_5', 'pm₂.₅': 'pm2_5',
-                        'pm10': 'pm10', 'pm₁₀': 'pm10',
-                        'so2': 'so2', 'so₂': 'so2'
-                    }
-                    for title_key, result_key in key_map.items():
-                        if title_key in title:
-                            result[result_key] = value
-                            break
-            return result
-        except Exception as e:
-            _LOGGER.debug("Lỗi khi phân tích dữ liệu AQI từ dbtt: %s", e)
-            return {}
+        return _parse_air_quality(html_content, self._html_parser)
 
     def _convert_ug_to_ppm_for_co(self, ug_value):
         """Chuyển đổi từ µg/m³ sang ppm cho CO. Giữ lại để tương thích."""
@@ -0,0 +1,56 @@
+"""Chẩn đoán cho tích hợp Weather Vn."""
+from __future__ import annotations
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .data_service import (
+    DECODE_STATS,
+    HASH_STATS,
+    HEDGE_STATS,
+    KEY_PATH_STATS,
+    STREAM_STATS,
+)
+from .network import (
+    CIRCUIT_BREAKERS,
+    LATENCY_TRACKER,
+    RATE_LIMITER,
+    RESPONSE_CACHE,
+    SINGLE_FLIGHT,
+    VALIDATOR_CACHE,
+)
+from . import WeatherVnDataUpdateCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Trả về thông tin chẩn đoán cho một mục cấu hình."""
+    coordinator: WeatherVnDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "province": coordinator.province,
+        "district": coordinator.district,
+        "last_update_success": coordinator.last_update_success,
+        "http": coordinator.http_client.stats(),
+        "single_flight": SINGLE_FLIGHT.stats(),
+        "conditional_get": VALIDATOR_CACHE.stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "rate_limiter": RATE_LIMITER.stats(),
+        "circuit_breakers": CIRCUIT_BREAKERS.stats(),
+        "latency": LATENCY_TRACKER.stats(),
+        "hedging": dict(HEDGE_STATS),
+        "jitter_seconds": coordinator.jitter.total_seconds(),
+        "msn_stream": dict(STREAM_STATS),
+        "parse_executor": coordinator.parse_executor.stats(),
+        "html_parser": coordinator.html_parser,
+        "key_path_cache": dict(KEY_PATH_STATS),
+        "redux_decode": dict(DECODE_STATS),
+        "payload_hash": dict(HASH_STATS),
+        "batch": (
+            coordinator.batch_scheduler.stats()
+            if coordinator.batch_scheduler is not None
+            else None
+        ),
+    }
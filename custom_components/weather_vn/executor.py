@@ -0,0 +1,147 @@
+"""Nhóm luồng/tiến trình phân tích dữ liệu dùng chung cho Weather Vn."""
+from __future__ import annotations
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import time
+from typing import Any, Callable
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_PARSE_EXECUTOR,
+    PARSE_BACKEND,
+    PARSE_BACKEND_PROCESS,
+    PARSE_WORKERS,
+    PARSE_BACKEND_THREAD,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WeatherVnParseExecutor:
+    """
+    Chạy các bước phân tích HTML/JSON trong một nhóm luồng hoặc tiến trình có giới hạn.
+
+    Với `max_workers` bằng 0, việc phân tích chạy ngay trên vòng lặp sự kiện
+    (hành vi cũ), giúp so sánh thời gian chặn vòng lặp trước và sau.
+    Nhóm tiến trình chỉ nhận các hàm thuần cấp module (dữ liệu thô vào, kết quả gọn ra)
+    và tự chuyển về nhóm luồng khi không khởi tạo được hoặc bị hỏng.
+    """
+
+    def __init__(self, max_workers: int, backend: str = PARSE_BACKEND_THREAD) -> None:
+        """Khởi tạo nhóm phân tích."""
+        self.max_workers = max_workers
+        self.backend = backend
+        self.active_backend = backend
+        self.jobs = 0
+        self.parse_seconds = 0.0
+        self.max_parse_seconds = 0.0
+        self.loop_blocked_seconds = 0.0
+        self.process_fallbacks = 0
+        self._pool: Executor | None = self._create_pool()
+        _LOGGER.debug("Nhóm phân tích: %d worker (%s)", max_workers, self.active_backend)
+
+    def _create_pool(self) -> Executor | None:
+        """Tạo nhóm theo cấu hình, chuyển về nhóm luồng nếu không tạo được nhóm tiến trình."""
+        self.active_backend = self.backend
+        if self.max_workers <= 0:
+            return None
+        if self.backend == PARSE_BACKEND_PROCESS:
+            try:
+                # "spawn" tránh sao chép trạng thái của tiến trình Home Assistant khi fork
+                return ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, ImportError, NotImplementedError, ValueError) as err:
+                _LOGGER.warning(
+                    "Không tạo được nhóm tiến trình phân tích (%s), dùng nhóm luồng", err
+                )
+                self.process_fallbacks += 1
+                self.active_backend = PARSE_BACKEND_THREAD
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="weather_vn_parse"
+        )
+
+    def _record(self, elapsed: float) -> None:
+        """Ghi lại thời gian của một bước phân tích."""
+        self.jobs += 1
+        self.parse_seconds += elapsed
+        self.max_parse_seconds = max(self.max_parse_seconds, elapsed)
+
+    def _timed(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Chạy hàm và ghi lại thời gian phân tích."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._record(time.perf_counter() - start)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Chạy một bước phân tích ngoài vòng lặp sự kiện (hoặc tại chỗ nếu không có worker)."""
+        if self._pool is None:
+            start = time.perf_counter()
+            try:
+                return self._timed(func, *args)
+            finally:
+                self.loop_blocked_seconds += time.perf_counter() - start
+
+        loop = asyncio.get_running_loop()
+        if self.active_backend != PARSE_BACKEND_PROCESS:
+            return await loop.run_in_executor(self._pool, self._timed, func, *args)
+
+        # Với tiến trình, thời gian đo bao gồm cả chi phí truyền dữ liệu qua lại
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._pool, func, *args)
+        except (BrokenProcessPool, OSError) as err:
+            _LOGGER.warning("Nhóm tiến trình phân tích bị hỏng (%s), chuyển sang nhóm luồng", err)
+            self.process_fallbacks += 1
+            broken_pool = self._pool
+            self.active_backend = PARSE_BACKEND_THREAD
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="weather_vn_parse"
+            )
+            broken_pool.shutdown(wait=False)
+            return await loop.run_in_executor(self._pool, self._timed, func, *args)
+        self._record(time.perf_counter() - start)
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê để chẩn đoán."""
+        return {
+            "workers": self.max_workers,
+            "backend": self.backend,
+            "active_backend": self.active_backend,
+            "process_fallbacks": self.process_fallbacks,
+            "jobs": self.jobs,
+            "avg_parse_ms": round(self.parse_seconds * 1000 / self.jobs, 2) if self.jobs else 0.0,
+            "max_parse_ms": round(self.max_parse_seconds * 1000, 2),
+            "loop_blocked_ms": round(self.loop_blocked_seconds * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        """Dừng nhóm phân tích."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+def async_get_parse_executor(hass: HomeAssistant) -> WeatherVnParseExecutor:
+    """Lấy (hoặc tạo) nhóm phân tích dùng chung với PARSE_WORKERS worker kiểu PARSE_BACKEND."""
+    executor = hass.data.get(DATA_PARSE_EXECUTOR)
+    if executor is None:
+        executor = hass.data[DATA_PARSE_EXECUTOR] = WeatherVnParseExecutor(
+            PARSE_WORKERS, PARSE_BACKEND
+        )
+    return executor
+
+
+def async_release_parse_executor(hass: HomeAssistant) -> None:
+    """Dừng nhóm phân tích khi mục cấu hình cuối cùng bị gỡ."""
+    executor = hass.data.pop(DATA_PARSE_EXECUTOR, None)
+    if executor is not None:
+        executor.shutdown()
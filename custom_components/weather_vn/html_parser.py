@@ -0,0 +1,132 @@
+"""Các bộ phân tích HTML có thể thay thế cho Weather Vn."""
+from __future__ import annotations
+import logging
+
+from bs4 import BeautifulSoup
+
+from .const import (
+    HTML_PARSER_AUTO,
+    HTML_PARSER_HTMLPARSER,
+    HTML_PARSER_LXML,
+    HTML_PARSER_SELECTOLAX,
+)
+
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+_LOGGER = logging.getLogger(__name__)
+
+# Thứ tự ưu tiên khi tự động chọn: nhanh nhất trước
+_PREFERENCE = (HTML_PARSER_SELECTOLAX, HTML_PARSER_LXML, HTML_PARSER_HTMLPARSER)
+
+
+def available_backends() -> list[str]:
+    """Danh sách bộ phân tích đã được cài đặt, theo thứ tự ưu tiên."""
+    installed = {
+        HTML_PARSER_SELECTOLAX: _SelectolaxParser is not None,
+        HTML_PARSER_LXML: _HAS_LXML,
+        HTML_PARSER_HTMLPARSER: True,
+    }
+    return [backend for backend in _PREFERENCE if installed[backend]]
+
+
+def select_backend(preferred: str = HTML_PARSER_AUTO) -> str:
+    """Chọn bộ phân tích: theo yêu cầu nếu đã cài, nếu không thì bộ nhanh nhất hiện có."""
+    available = available_backends()
+    if preferred != HTML_PARSER_AUTO:
+        if preferred in available:
+            return preferred
+        _LOGGER.warning(
+            "Bộ phân tích HTML %s chưa được cài đặt, dùng %s", preferred, available[0]
+        )
+    return available[0]
+
+
+class _SoupNode:
+    """Nút HTML dựa trên BeautifulSoup (html.parser hoặc lxml)."""
+
+    __slots__ = ("_tag",)
+
+    def __init__(self, tag) -> None:
+        """Bọc một Tag của BeautifulSoup."""
+        self._tag = tag
+
+    def select_one(self, selector: str) -> _SoupNode | None:
+        """Phần tử đầu tiên khớp bộ chọn CSS."""
+        tag = self._tag.select_one(selector)
+        return _SoupNode(tag) if tag is not None else None
+
+    def select(self, selector: str) -> list[_SoupNode]:
+        """Tất cả phần tử khớp bộ chọn CSS."""
+        return [_SoupNode(tag) for tag in self._tag.select(selector)]
+
+    @property
+    def classes(self) -> list[str]:
+        """Danh sách class của phần tử."""
+        return list(self._tag.get("class", []))
+
+    @property
+    def text(self) -> str:
+        """Toàn bộ văn bản bên trong phần tử."""
+        return self._tag.text
+
+    @property
+    def stripped_text(self) -> str:
+        """Các đoạn văn bản đã bỏ khoảng trắng, nối liền nhau."""
+        return "".join(self._tag.stripped_strings)
+
+
+class _SelectolaxNode:
+    """Nút HTML dựa trên selectolax (lexbor/modest)."""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node) -> None:
+        """Bọc một Node của selectolax."""
+        self._node = node
+
+    def select_one(self, selector: str) -> _SelectolaxNode | None:
+        """Phần tử đầu tiên khớp bộ chọn CSS."""
+        node = self._node.css_first(selector)
+        return _SelectolaxNode(node) if node is not None else None
+
+    def select(self, selector: str) -> list[_SelectolaxNode]:
+        """Tất cả phần tử khớp bộ chọn CSS."""
+        return [_SelectolaxNode(node) for node in self._node.css(selector)]
+
+    @property
+    def classes(self) -> list[str]:
+        """Danh sách class của phần tử."""
+        return (self._node.attributes.get("class") or "").split()
+
+    @property
+    def text(self) -> str:
+        """Toàn bộ văn bản bên trong phần tử."""
+        return self._node.text(deep=True)
+
+    @property
+    def stripped_text(self) -> str:
+        """Các đoạn văn bản đã bỏ khoảng trắng, nối liền nhau."""
+        return self._node.text(deep=True, separator="", strip=True)
+
+
+def parse_html(html: str, backend: str) -> _SoupNode | _SelectolaxNode:
+    """Phân tích HTML bằng bộ phân tích đã chọn và trả về nút gốc."""
+    if backend == HTML_PARSER_SELECTOLAX and _SelectolaxParser is not None:
+        return _SelectolaxNode(_SelectolaxParser(html).root)
+    if backend == HTML_PARSER_LXML and _HAS_LXML:
+        return _SoupNode(BeautifulSoup(html, "lxml"))
+    return _SoupNode(BeautifulSoup(html, "html.parser"))
+
+
+# Bộ phân tích nhanh nhất hiện có, chọn một lần khi nạp module (giá trị đã chọn, khác với
+# tùy chọn "auto" const.DEFAULT_HTML_PARSER)
+RESOLVED_HTML_PARSER = select_backend()
@@ -0,0 +1,266 @@
+"""Kiểu bản ghi gọn (dùng __slots__) cho dữ liệu thời tiết của Weather Vn."""
+from __future__ import annotations
+from array import array
+from typing import Any, Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Giá trị thiếu trong cột số; luôn dùng cùng một đối tượng để so sánh theo byte được
+_NAN = float("nan")
+
+
+class _Record:
+    """
+    Bản ghi có tập trường cố định, không có __dict__ riêng cho mỗi đối tượng.
+
+    Vẫn đọc được như dict (get, [], in, keys, items) để mã cũ tiếp tục chạy,
+    và chuyển sang dict thuần bằng to_dict khi cần tuần tự hóa.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **fields: Any) -> None:
+        """Khởi tạo bản ghi, các trường không được truyền vào có giá trị None."""
+        unknown = fields.keys() - set(self.__slots__)
+        if unknown:
+            raise TypeError(f"{type(self).__name__} không có trường {sorted(unknown)}")
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> _Record:
+        """Tạo bản ghi từ dict, bỏ qua các khóa không thuộc bản ghi."""
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def to_dict(self) -> dict[str, Any]:
+        """Chuyển sang dict thuần (dùng cho ảnh chụp trên đĩa và chẩn đoán)."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Đọc trường như dict.get."""
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        """Đọc trường như dict[key]."""
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Kiểm tra trường như `key in dict`."""
+        return key in self.__slots__
+
+    def keys(self) -> tuple[str, ...]:
+        """Tên các trường."""
+        return self.__slots__
+
+    def values(self) -> list[Any]:
+        """Giá trị các trường."""
+        return [getattr(self, name) for name in self.__slots__]
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        """Các cặp (tên trường, giá trị)."""
+        return ((name, getattr(self, name)) for name in self.__slots__)
+
+    def __bool__(self) -> bool:
+        """Bản ghi rỗng (mọi trường là None) được coi là False, giống dict rỗng."""
+        return any(getattr(self, name) is not None for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        """So sánh theo giá trị các trường."""
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Biểu diễn để gỡ lỗi."""
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class CurrentWeather(_Record):
+    """Thời tiết hiện tại."""
+
+    __slots__ = (
+        "temperature",
+        "apparent_temperature",
+        "condition",
+        "humidity",
+        "wind_speed",
+        "wind_gust",
+        "dew_point",
+        "uv",
+        "pressure",
+        "visibility",
+        "precipitation_amount",
+        "precipitation_accumulation",
+        "precipitation_probability",
+        "precipitation_next_hour_amount",
+        "precipitation_next_hour_accumulation",
+        "sunrise",
+        "sunset",
+        "temp_low",
+        "temp_high",
+        "precipitation_today",
+        "rain_forecast",
+    )
+
+
+class HourlyForecast(_Record):
+    """Một giờ trong dự báo hàng giờ."""
+
+    __slots__ = (
+        "datetime",
+        "temperature",
+        "apparent_temperature",
+        "humidity",
+        "condition",
+        "precipitation_probability",
+        "wind_speed",
+    )
+
+
+class DailyForecast(_Record):
+    """Một ngày trong dự báo hàng ngày."""
+
+    __slots__ = (
+        "datetime",
+        "condition",
+        "temp_high",
+        "temp_low",
+        "precipitation_probability",
+        "precipitation",
+        "humidity",
+        "wind_speed",
+        "sunrise",
+        "sunset",
+    )
+
+
+def _numeric_column(values: Iterable[float | None]) -> Any:
+    """Tạo cột số thực 8 byte (NumPy nếu có, nếu không thì array('d')), None thành NaN."""
+    filled = [_NAN if value is None else value for value in values]
+    if np is not None:
+        return np.array(filled, dtype=np.float64)
+    return array("d", filled)
+
+
+class HourlyColumns:
+    """
+    Dự báo hàng giờ lưu theo cột (struct-of-arrays).
+
+    Mỗi trường số là một cột số thực liền mạch thay vì một đối tượng float cho mỗi ô,
+    đọc thẳng được theo cột (values) mà không dựng bản ghi cho từng giờ.
+    Duyệt (for, []) vẫn trả về từng HourlyForecast để mã cũ tiếp tục chạy.
+    """
+
+    NUMERIC_FIELDS = (
+        "temperature",
+        "apparent_temperature",
+        "humidity",
+        "precipitation_probability",
+        "wind_speed",
+    )
+    __slots__ = ("datetime", "condition") + NUMERIC_FIELDS
+
+    def __init__(
+        self,
+        datetime: list[str | None],
+        condition: list[str | None],
+        **numeric: Iterable[float | None],
+    ) -> None:
+        """Khởi tạo từ các cột; cột số có thể là danh sách (None là giá trị thiếu)."""
+        self.datetime = datetime
+        self.condition = condition
+        for name in self.NUMERIC_FIELDS:
+            setattr(self, name, _numeric_column(numeric.get(name, [None] * len(datetime))))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[HourlyForecast | dict[str, Any]]) -> HourlyColumns:
+        """Tạo từ danh sách bản ghi hoặc dict (ví dụ dữ liệu cũ trong ảnh chụp)."""
+        rows = list(rows)
+        return cls(
+            [row.get("datetime") for row in rows],
+            [row.get("condition") for row in rows],
+            **{name: [row.get(name) for row in rows] for name in cls.NUMERIC_FIELDS},
+        )
+
+    def values(self, field: str) -> list[Any]:
+        """Cột dưới dạng danh sách Python, giá trị thiếu là None."""
+        column = getattr(self, field)
+        if field not in self.NUMERIC_FIELDS:
+            return list(column)
+        items = column.tolist()
+        return [None if value != value else value for value in items]
+
+    def __len__(self) -> int:
+        """Số giờ dự báo."""
+        return len(self.datetime)
+
+    def __getitem__(self, index: int) -> HourlyForecast:
+        """Một giờ dưới dạng bản ghi."""
+        fields = {"datetime": self.datetime[index], "condition": self.condition[index]}
+        for name in self.NUMERIC_FIELDS:
+            value = float(getattr(self, name)[index])
+            fields[name] = None if value != value else value
+        return HourlyForecast(**fields)
+
+    def __iter__(self) -> Iterator[HourlyForecast]:
+        """Duyệt từng giờ dưới dạng bản ghi."""
+        return (self[index] for index in range(len(self)))
+
+    def to_dict(self) -> list[dict[str, Any]]:
+        """Chuyển sang danh sách dict thuần (dùng cho ảnh chụp trên đĩa)."""
+        columns = {name: self.values(name) for name in self.__slots__}
+        return [
+            {name: columns[name][index] for name in self.__slots__}
+            for index in range(len(self))
+        ]
+
+    def __eq__(self, other: object) -> bool:
+        """So sánh theo nội dung; cột số so theo byte để NaN bằng NaN."""
+        if not isinstance(other, HourlyColumns):
+            return NotImplemented
+        return (
+            self.datetime == other.datetime
+            and self.condition == other.condition
+            and all(
+                getattr(self, name).tobytes() == getattr(other, name).tobytes()
+                for name in self.NUMERIC_FIELDS
+            )
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        """Biểu diễn để gỡ lỗi."""
+        return f"HourlyColumns({len(self)} giờ)"
+
+
+def data_to_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Chuyển dữ liệu tổng hợp của coordinator sang dạng JSON thuần."""
+    result = dict(data)
+    if "current_weather" in data:
+        result["current_weather"] = data["current_weather"].to_dict()
+    if "hourly_forecast" in data:
+        result["hourly_forecast"] = data["hourly_forecast"].to_dict()
+    if "daily_forecast" in data:
+        result["daily_forecast"] = [item.to_dict() for item in data["daily_forecast"]]
+    return result
+
+
+def data_from_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Dựng lại các bản ghi từ dữ liệu tổng hợp dạng JSON thuần (ví dụ từ ảnh chụp)."""
+    result = dict(data)
+    result["current_weather"] = CurrentWeather.from_dict(data.get("current_weather") or {})
+    result["hourly_forecast"] = HourlyColumns.from_rows(data.get("hourly_forecast", []))
+    result["daily_forecast"] = [
+        DailyForecast.from_dict(item) for item in data.get("daily_forecast", [])
+    ]
+    return result
@@ -0,0 +1,222 @@
+"""Bảng ánh xạ trường dữ liệu MSN sang cấu trúc của Weather Vn."""
+from __future__ import annotations
+from functools import partial
+import re
+from typing import Any, Callable, Iterable, NamedTuple
+
+# Phần số ở đầu chuỗi, ví dụ "28°" -> "28", "-3.5 km/h" -> "-3.5"
+_NUMERIC_PREFIX_RE = re.compile(r"^-?\d+\.?\d*")
+
+# Hệ số đổi đơn vị dùng cho các cột số của MSN.
+# km/h -> m/s là phép chia cho 3.6 (nhân với 1/3.6 lệch bit cuối ở nhiều giá trị)
+KMH_PER_MS = 3.6
+CM_TO_MM = 10.0
+
+# Các cách chuyển đổi dùng trong bảng ánh xạ
+NUMBER = "number"
+KMH = "kmh_to_ms"
+CM = "cm_to_mm"
+TEXT = "text"
+TIME = "time"
+DATE = "date"
+
+# Chuyển đổi số -> (hệ số nhân, số chia)
+_SCALES = {NUMBER: (1.0, 1.0), KMH: (1.0, KMH_PER_MS), CM: (CM_TO_MM, 1.0)}
+
+
+def parse_numeric(value, default=None):
+    """
+    Phân tích một cách an toàn một giá trị số từ một chuỗi có thể chứa các đơn vị,
+    hoặc trả về giá trị nếu nó đã là một số. Luôn trả về float.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _NUMERIC_PREFIX_RE.match(value)
+        if match:
+            return float(match.group())
+    if default is not None:
+        return float(default)
+    return None
+
+
+def parse_numeric_column(
+    values, scale: float = 1.0, divisor: float = 1.0, default=None
+) -> list[float | None]:
+    """
+    Phân tích cả một cột giá trị MSN thành float và đổi đơn vị trong một lượt.
+
+    Mỗi giá trị được nhân `scale` hoặc chia `divisor` (chỉ một trong hai khác 1, để kết quả
+    giống hệt phép tính trên từng giá trị). Giá trị đã là số đi đường tắt không qua regex;
+    giá trị không đọc được lấy `default` (cũng được đổi đơn vị), hoặc None nếu không có mặc định.
+    """
+    if scale != 1.0 and divisor != 1.0:
+        raise ValueError("Chỉ dùng một trong hai: hệ số nhân hoặc số chia")
+    match = _NUMERIC_PREFIX_RE.match
+    divide = divisor != 1.0
+    factor = float(divisor if divide else scale)
+    fallback = None
+    if default is not None:
+        fallback = float(default) / factor if divide else float(default) * factor
+    result = []
+    append = result.append
+    for value in values:
+        if isinstance(value, (int, float)):
+            number = value
+        elif isinstance(value, str) and (found := match(value)):
+            number = float(found.group())
+        else:
+            append(fallback)
+            continue
+        append(number / factor if divide else number * factor)
+    return result
+
+
+# --- Bảng ánh xạ: (đường dẫn nguồn, khóa đích, chuyển đổi, mặc định) ---
+# Đường dẫn nguồn dùng dấu chấm để đi vào các dict lồng nhau.
+
+# Nguồn của thời tiết hiện tại là một dict gom nhiều khối thô:
+# current (currentCondition), first_hour/next_hour (giờ đầu/giờ thứ hai của hôm nay),
+# today (ngày đầu tiên của dự báo) và nowcasting
+CURRENT_FIELDS = (
+    ("current.currentTemperature", "temperature", NUMBER, None),
+    ("current.feels", "apparent_temperature", NUMBER, None),
+    ("current.shortCap", "condition", TEXT, None),
+    ("current.humidity", "humidity", NUMBER, None),
+    ("current.windSpeed", "wind_speed", KMH, 0),
+    ("current.windGust", "wind_gust", NUMBER, None),
+    ("current.dewPoint", "dew_point", NUMBER, None),
+    ("current.uv", "uv", NUMBER, None),
+    ("current.baro", "pressure", NUMBER, None),
+    # MSN viết sai chính tả "visiblity"
+    ("current.visiblity", "visibility", NUMBER, None),
+    ("first_hour.rainAmount", "precipitation_amount", CM, 0),
+    ("first_hour.raAccu", "precipitation_accumulation", CM, 0),
+    # Xác suất mưa lấy của giờ tiếp theo
+    ("next_hour.precipitation", "precipitation_probability", NUMBER, 0),
+    ("next_hour.rainAmount", "precipitation_next_hour_amount", CM, 0),
+    ("next_hour.raAccu", "precipitation_next_hour_accumulation", CM, 0),
+    ("today.almanac.sunrise", "sunrise", TIME, ""),
+    ("today.almanac.sunset", "sunset", TIME, ""),
+    ("today.lowTemp", "temp_low", NUMBER, None),
+    ("today.highTemp", "temp_high", NUMBER, None),
+    ("today.raToMN", "precipitation_today", CM, 0),
+    ("nowcasting.summary", "rain_forecast", TEXT, None),
+)
+
+HOURLY_FIELDS = (
+    ("timeStr", "datetime", TEXT, None),
+    ("cap", "condition", TEXT, None),
+    ("temperature", "temperature", NUMBER, None),
+    ("feels", "apparent_temperature", NUMBER, None),
+    ("humidity", "humidity", NUMBER, None),
+    ("precipitation", "precipitation_probability", NUMBER, 0),
+    ("windSpeed", "wind_speed", KMH, 0),
+)
+
+DAILY_FIELDS = (
+    ("almanac.valid", "datetime", DATE, ""),
+    ("dayCap", "condition", TEXT, None),
+    ("highTemp", "temp_high", NUMBER, None),
+    ("lowTemp", "temp_low", NUMBER, None),
+    ("day.precipitation", "precipitation_probability", NUMBER, 0),
+    # raToMN tính bằng cm
+    ("raToMN", "precipitation", CM, 0),
+    ("day.humidity", "humidity", NUMBER, None),
+    ("windSpeed", "wind_speed", KMH, 0),
+    ("almanac.sunrise", "sunrise", TIME, ""),
+    ("almanac.sunset", "sunset", TIME, ""),
+)
+
+
+class _CompiledField(NamedTuple):
+    """Một dòng của bảng ánh xạ sau khi biên dịch thành các hàm."""
+
+    target: str
+    get: Callable[[dict], Any]
+    convert: Callable[[Any], Any]
+    convert_column: Callable[[list], list]
+
+
+def _compile_path(path: str) -> Callable[[dict], Any]:
+    """Hàm đọc giá trị theo đường dẫn, None nếu thiếu ở bất kỳ cấp nào."""
+    keys = tuple(path.split("."))
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda raw: raw.get(key)
+
+    def get(raw: dict) -> Any:
+        for key in keys:
+            if not isinstance(raw, dict):
+                return None
+            raw = raw.get(key)
+        return raw
+
+    return get
+
+
+def _compile_convert(conversion: str, default: Any) -> Callable[[Any], Any]:
+    """Hàm chuyển đổi một giá trị thô theo kiểu chuyển đổi trong bảng."""
+    if conversion in _SCALES:
+        scale, divisor = _SCALES[conversion]
+
+        def number(value: Any) -> float | None:
+            parsed = parse_numeric(value, default)
+            if parsed is None:
+                return None
+            return parsed / divisor if divisor != 1.0 else parsed * scale
+
+        return number
+    if conversion == TIME:
+        return lambda value: value.split("T")[-1] if isinstance(value, str) else default
+    if conversion == DATE:
+        return lambda value: value.split("T")[0] if isinstance(value, str) else default
+    if conversion == TEXT:
+        return lambda value: default if value is None else value
+    raise ValueError(f"Kiểu chuyển đổi không hợp lệ: {conversion}")
+
+
+def _compile_field(source: str, target: str, conversion: str, default: Any) -> _CompiledField:
+    """Biên dịch một dòng của bảng ánh xạ."""
+    convert = _compile_convert(conversion, default)
+    if conversion in _SCALES:
+        scale, divisor = _SCALES[conversion]
+        convert_column = partial(
+            parse_numeric_column, scale=scale, divisor=divisor, default=default
+        )
+    else:
+        def convert_column(values: list) -> list:
+            return [convert(value) for value in values]
+    return _CompiledField(target, _compile_path(source), convert, convert_column)
+
+
+class FieldMap:
+    """Bảng ánh xạ đã biên dịch: đọc một bản ghi hoặc cả một cột bản ghi thô trong một lượt."""
+
+    __slots__ = ("targets", "_fields")
+
+    def __init__(self, table: Iterable[tuple[str, str, str, Any]]) -> None:
+        """Biên dịch bảng ánh xạ (chạy một lần khi nạp module)."""
+        self._fields = tuple(_compile_field(*row) for row in table)
+        self.targets = tuple(field.target for field in self._fields)
+
+    def record(self, raw: dict) -> dict[str, Any]:
+        """Ánh xạ một dict thô sang dict theo khóa đích."""
+        return {field.target: field.convert(field.get(raw)) for field in self._fields}
+
+    def columns(self, rows: list[dict]) -> dict[str, list]:
+        """Ánh xạ danh sách dict thô sang các cột theo khóa đích (số được phân tích theo cột)."""
+        return {
+            field.target: field.convert_column([field.get(row) for row in rows])
+            for field in self._fields
+        }
+
+    def records(self, rows: list[dict]) -> list[dict[str, Any]]:
+        """Ánh xạ danh sách dict thô sang danh sách dict, phân tích theo cột bên trong."""
+        columns = self.columns(rows)
+        return [dict(zip(self.targets, values)) for values in zip(*columns.values())]
+
+
+CURRENT_FIELD_MAP = FieldMap(CURRENT_FIELDS)
+HOURLY_FIELD_MAP = FieldMap(HOURLY_FIELDS)
+DAILY_FIELD_MAP = FieldMap(DAILY_FIELDS)
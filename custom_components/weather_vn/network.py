@@ -0,0 +1,631 @@
+"""Lớp mạng dùng chung cho Weather Vn."""
+from __future__ import annotations
+import asyncio
+from collections import OrderedDict, deque
+import contextlib
+import logging
+import random
+import sys
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import urlparse
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+
+from .const import (
+    CIRCUIT_BASE_BACKOFF,
+    CIRCUIT_BREAKER_HOSTS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_HALF_OPEN_PROBES,
+    CIRCUIT_MAX_BACKOFF,
+    CIRCUIT_STATE_CLOSED,
+    CIRCUIT_STATE_HALF_OPEN,
+    CIRCUIT_STATE_OPEN,
+    DATA_HTTP_CLIENT,
+    HTTP_CONNECTION_LIMIT,
+    HTTP_CONNECTION_LIMIT_PER_HOST,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT,
+    LATENCY_WINDOW,
+    RATE_LIMITS,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTLS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _match_domain(url: str, mapping: dict[str, Any]) -> Any:
+    """Tìm giá trị cấu hình theo tên miền của `url` (bao gồm cả tên miền con)."""
+    host = urlparse(url).hostname or ""
+    for domain, value in mapping.items():
+        if host == domain or host.endswith(f".{domain}"):
+            return value
+    return None
+
+
+class WeatherVnHttpClient:
+    """Phiên HTTP dùng chung cho tất cả các mục cấu hình Weather Vn."""
+
+    def __init__(self) -> None:
+        """Khởi tạo phiên với connector giữ kết nối và bộ nhớ đệm DNS."""
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.requests_sent = 0
+        # Hủy đăng ký việc đóng phiên khi Home Assistant dừng (xem async_get_http_client)
+        self.remove_close_listener: Callable[[], None] | None = None
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_CONNECTION_LIMIT,
+            limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            use_dns_cache=True,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[trace_config],
+        )
+
+    async def _on_request_start(self, session, context, params) -> None:
+        """Đếm số yêu cầu đã gửi."""
+        self.requests_sent += 1
+
+    async def _on_connection_create_end(self, session, context, params) -> None:
+        """Đếm số kết nối mới (phải bắt tay DNS/TCP/TLS)."""
+        self.connections_created += 1
+
+    async def _on_connection_reuseconn(self, session, context, params) -> None:
+        """Đếm số lần dùng lại kết nối keep-alive."""
+        self.connections_reused += 1
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Tỷ lệ yêu cầu dùng lại kết nối có sẵn."""
+        total = self.connections_created + self.connections_reused
+        if not total:
+            return 0.0
+        return round(self.connections_reused / total, 3)
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê kết nối để chẩn đoán."""
+        return {
+            "requests_sent": self.requests_sent,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.reuse_ratio,
+        }
+
+    async def async_close(self) -> None:
+        """Đóng phiên và toàn bộ kết nối."""
+        _LOGGER.debug("Đóng phiên HTTP dùng chung: %s", self.stats())
+        await self.session.close()
+
+
+class SingleFlight:
+    """
+    Gộp các yêu cầu đồng thời có cùng khóa (URL) thành một lần tải duy nhất.
+
+    URL được dựng từ tỉnh và quận/huyện, cũng là unique_id của mục cấu hình, nên hai mục
+    không bao giờ trùng khóa. Thực tế chỉ gộp các lần làm mới chồng nhau của cùng một mục
+    (làm mới thủ công trùng lịch, kiểm tra lại bản lưu trùng lần làm mới đầu).
+    """
+
+    def __init__(self) -> None:
+        """Khởi tạo sổ đăng ký các yêu cầu đang chạy."""
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Chạy `factory` cho `key`, hoặc chờ kết quả của lần chạy đang diễn ra."""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+            _LOGGER.debug("Dùng chung yêu cầu đang chạy cho %s", key)
+        # shield để một bên gọi bị hủy không làm hủy kết quả của các bên còn lại
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê để chẩn đoán."""
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+
+# Sổ đăng ký dùng chung cho toàn bộ tiến trình
+SINGLE_FLIGHT = SingleFlight()
+
+
+class TokenBucket:
+    """Bộ giới hạn tốc độ kiểu token bucket, các bên chờ được phục vụ theo thứ tự."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Khởi tạo với tốc độ nạp `rate` token/giây và sức chứa `capacity`."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self) -> None:
+        """Nạp thêm token theo thời gian đã trôi qua."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """Chờ tới khi có token, trả về số giây đã chờ."""
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - start
+        self.acquired += 1
+        if waited > 0.001:
+            self.delayed += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê để chẩn đoán."""
+        return {
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "avg_wait": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "max_wait": round(self.max_wait, 3),
+        }
+
+
+class HostRateLimiter:
+    """Giới hạn tốc độ yêu cầu ra ngoài theo từng máy chủ, dùng chung toàn tiến trình."""
+
+    def __init__(self, limits: dict[str, tuple[float, int]]) -> None:
+        """Khởi tạo một token bucket cho mỗi tên miền được cấu hình."""
+        self._buckets = {
+            domain: TokenBucket(rate, capacity) for domain, (rate, capacity) in limits.items()
+        }
+
+    async def acquire(self, url: str) -> None:
+        """Chờ lượt gửi yêu cầu tới máy chủ của `url`."""
+        bucket = _match_domain(url, self._buckets)
+        if bucket is None:
+            return
+        waited = await bucket.acquire()
+        if waited > 0.001:
+            _LOGGER.debug("Đã chờ %.2f giây theo giới hạn tốc độ cho %s", waited, url)
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê của từng máy chủ."""
+        return {domain: bucket.stats() for domain, bucket in self._buckets.items()}
+
+
+# Bộ giới hạn tốc độ dùng chung cho toàn bộ tiến trình
+RATE_LIMITER = HostRateLimiter(RATE_LIMITS)
+
+
+class ValidatorCache:
+    """
+    Lưu ETag/Last-Modified và kết quả đã phân tích theo từng URL.
+
+    Khi máy chủ trả 304 Not Modified, kết quả đã phân tích lần trước được dùng lại
+    mà không cần tải và phân tích lại trang.
+    """
+
+    def __init__(self) -> None:
+        """Khởi tạo bộ nhớ đệm rỗng."""
+        # URL -> (ETag, Last-Modified, kết quả đã phân tích, số byte của lần tải đầy đủ)
+        self._entries: dict[str, tuple[str | None, str | None, Any, int]] = {}
+        self.conditional_sent = 0
+        self.not_modified = 0
+        self.full_responses = 0
+        self.bytes_saved = 0
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        """Tiêu đề điều kiện cho `url`, rỗng nếu chưa có kết quả đã lưu."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        etag, last_modified, _, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        if headers:
+            self.conditional_sent += 1
+        return headers
+
+    def reuse(self, url: str) -> Any:
+        """Trả về kết quả đã lưu khi nhận 304, hoặc None nếu không có."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        self.not_modified += 1
+        self.bytes_saved += entry[3]
+        return entry[2]
+
+    def store(self, url: str, headers: Any, result: Any, size: int) -> None:
+        """Lưu bộ xác thực và kết quả của một phản hồi đầy đủ."""
+        self.full_responses += 1
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self._entries.pop(url, None)
+            return
+        self._entries[url] = (etag, last_modified, result, size)
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê để chẩn đoán."""
+        answered = self.not_modified + self.full_responses
+        return {
+            "urls_with_validators": len(self._entries),
+            "conditional_sent": self.conditional_sent,
+            "not_modified": self.not_modified,
+            "full_responses": self.full_responses,
+            "not_modified_ratio": round(self.not_modified / answered, 3) if answered else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+# Bộ nhớ đệm bộ xác thực dùng chung cho toàn bộ tiến trình
+VALIDATOR_CACHE = ValidatorCache()
+
+
+class ResponseCache:
+    """
+    Bộ nhớ đệm nội dung phản hồi theo URL, có thời gian sống theo nguồn và loại bỏ LRU.
+
+    Giới hạn cả số mục lẫn tổng kích thước để bộ nhớ không tăng theo số mục cấu hình.
+    """
+
+    def __init__(self, ttls: dict[str, float], max_entries: int, max_bytes: int) -> None:
+        """Khởi tạo bộ nhớ đệm rỗng."""
+        self._ttls = ttls
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # URL -> (thời điểm hết hạn, nội dung, kích thước byte)
+        self._entries: OrderedDict[str, tuple[float, bytes | str, int]] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, url: str) -> bytes | str | None:
+        """Trả về nội dung còn hạn của `url`, hoặc None."""
+        entry = self._entries.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            self._drop(url)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(url)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, url: str, content: bytes | str) -> None:
+        """Lưu nội dung của `url` nếu nguồn có thời gian sống, loại bỏ mục cũ nhất khi đầy."""
+        ttl = _match_domain(url, self._ttls)
+        size = sys.getsizeof(content)
+        if not ttl or size > self.max_bytes:
+            return
+        if url in self._entries:
+            self._drop(url)
+        self._entries[url] = (time.monotonic() + ttl, content, size)
+        self.total_bytes += size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, url: str) -> None:
+        """Xóa một mục và cập nhật tổng kích thước."""
+        _, _, size = self._entries.pop(url)
+        self.total_bytes -= size
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê để chẩn đoán."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Bộ nhớ đệm phản hồi dùng chung cho toàn bộ tiến trình
+RESPONSE_CACHE = ResponseCache(
+    RESPONSE_CACHE_TTLS, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES
+)
+
+
+class CircuitOpenError(Exception):
+    """Yêu cầu bị từ chối vì máy chủ nguồn đang bị ngắt mạch."""
+
+
+class CircuitBreaker:
+    """
+    Bộ ngắt mạch cho một máy chủ nguồn: đóng -> mở -> nửa mở.
+
+    Sau `failure_threshold` lỗi liên tiếp, mạch mở và mọi yêu cầu bị từ chối ngay.
+    Thời gian mở tăng gấp đôi sau mỗi lần thử thất bại (có độ lệch ngẫu nhiên) tới `max_backoff`.
+    Hết thời gian mở, mạch nửa mở và chỉ cho `half_open_probes` yêu cầu thử đi qua.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int,
+        base_backoff: float,
+        max_backoff: float,
+        half_open_probes: int,
+    ) -> None:
+        """Khởi tạo bộ ngắt mạch ở trạng thái đóng."""
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.half_open_probes = half_open_probes
+        self._state = CIRCUIT_STATE_CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._probes_in_flight = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Trạng thái hiện tại; mạch mở tự chuyển sang nửa mở khi hết thời gian chờ."""
+        if self._state == CIRCUIT_STATE_OPEN and time.monotonic() >= self._open_until:
+            self._state = CIRCUIT_STATE_HALF_OPEN
+        return self._state
+
+    @property
+    def seconds_until_probe(self) -> float:
+        """Số giây còn lại tới lần thử tiếp theo, 0 nếu mạch không mở."""
+        if self.state != CIRCUIT_STATE_OPEN:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def _acquire(self) -> None:
+        """Xin phép gửi yêu cầu, ném CircuitOpenError nếu mạch đang mở hoặc hết lượt thử."""
+        state = self.state
+        if state == CIRCUIT_STATE_OPEN or (
+            state == CIRCUIT_STATE_HALF_OPEN and self._probes_in_flight >= self.half_open_probes
+        ):
+            self.rejected += 1
+            raise CircuitOpenError(
+                f"{self.host} đang bị ngắt mạch, thử lại sau {self.seconds_until_probe:.0f} giây"
+            )
+        if state == CIRCUIT_STATE_HALF_OPEN:
+            self._probes_in_flight += 1
+
+    def _release(self, state: str) -> None:
+        """Trả lượt thử khi yêu cầu được gửi ở trạng thái nửa mở kết thúc."""
+        if state == CIRCUIT_STATE_HALF_OPEN:
+            self._probes_in_flight -= 1
+
+    def _record_success(self) -> None:
+        """Máy chủ đã trả lời: đóng mạch và xóa bộ đếm lỗi."""
+        if self._state != CIRCUIT_STATE_CLOSED:
+            _LOGGER.info("%s đã hoạt động trở lại, đóng mạch", self.host)
+        self._state = CIRCUIT_STATE_CLOSED
+        self._failures = 0
+        self._trips = 0
+
+    def _record_failure(self, probe: bool) -> None:
+        """
+        Ghi nhận một lỗi; mở mạch khi đủ ngưỡng lúc đang đóng hoặc khi yêu cầu thử thất bại.
+
+        Lỗi của các yêu cầu đã gửi trước khi mạch mở chỉ được đếm, không kéo dài thời gian mở.
+        """
+        self._failures += 1
+        if not probe and (
+            self.state != CIRCUIT_STATE_CLOSED or self._failures < self.failure_threshold
+        ):
+            return
+        self._trips += 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._trips - 1))
+        # Độ lệch ngẫu nhiên để các tiến trình không cùng thử lại một lúc
+        backoff *= random.uniform(0.5, 1.0)
+        self._open_until = time.monotonic() + backoff
+        if self._state == CIRCUIT_STATE_CLOSED:
+            self.opened += 1
+            _LOGGER.warning(
+                "%s lỗi %d lần liên tiếp, tạm ngừng gửi yêu cầu trong %.0f giây",
+                self.host, self._failures, backoff,
+            )
+        else:
+            _LOGGER.debug("Yêu cầu thử tới %s thất bại, mở mạch thêm %.0f giây", self.host, backoff)
+        self._state = CIRCUIT_STATE_OPEN
+
+    @contextlib.asynccontextmanager
+    async def guard(self) -> AsyncIterator[None]:
+        """
+        Bao một yêu cầu tới máy chủ.
+
+        Lỗi kết nối, hết thời gian chờ, HTTP 5xx và 429 được tính là lỗi của máy chủ;
+        các lỗi khác (4xx, lỗi phân tích, hủy tác vụ) không làm thay đổi trạng thái mạch.
+        """
+        self._acquire()
+        state = self._state
+        # Chỉ yêu cầu được gửi lúc nửa mở mới là yêu cầu thử
+        probe = state == CIRCUIT_STATE_HALF_OPEN
+        try:
+            yield
+        except aiohttp.ClientResponseError as err:
+            if err.status >= 500 or err.status == 429:
+                self._record_failure(probe)
+            else:
+                self._record_success()
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._record_failure(probe)
+            raise
+        else:
+            self._record_success()
+        finally:
+            self._release(state)
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê để chẩn đoán."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "seconds_until_probe": round(self.seconds_until_probe, 1),
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class HostCircuitBreakers:
+    """Các bộ ngắt mạch theo máy chủ nguồn, dùng chung toàn tiến trình."""
+
+    def __init__(self, hosts: tuple[str, ...]) -> None:
+        """Khởi tạo một bộ ngắt mạch cho mỗi tên miền được cấu hình."""
+        self._breakers = {
+            domain: CircuitBreaker(
+                domain,
+                CIRCUIT_FAILURE_THRESHOLD,
+                CIRCUIT_BASE_BACKOFF,
+                CIRCUIT_MAX_BACKOFF,
+                CIRCUIT_HALF_OPEN_PROBES,
+            )
+            for domain in hosts
+        }
+
+    def guard(self, url: str) -> contextlib.AbstractAsyncContextManager:
+        """Bao một yêu cầu tới máy chủ của `url` (không làm gì nếu máy chủ không được theo dõi)."""
+        breaker = _match_domain(url, self._breakers)
+        if breaker is None:
+            return contextlib.nullcontext()
+        return breaker.guard()
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về số liệu thống kê của từng máy chủ."""
+        return {domain: breaker.stats() for domain, breaker in self._breakers.items()}
+
+
+# Bộ ngắt mạch dùng chung cho toàn bộ tiến trình
+CIRCUIT_BREAKERS = HostCircuitBreakers(CIRCUIT_BREAKER_HOSTS)
+
+
+class LatencyTracker:
+    """Lưu thời gian tải gần đây của từng nguồn dữ liệu và tính các phân vị."""
+
+    def __init__(self, window: int) -> None:
+        """Khởi tạo với số mẫu tối đa giữ lại cho mỗi nguồn."""
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, source: str, seconds: float) -> None:
+        """Ghi lại thời gian của một lần tải thành công."""
+        samples = self._samples.get(source)
+        if samples is None:
+            samples = self._samples[source] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def count(self, source: str) -> int:
+        """Số mẫu hiện có của nguồn."""
+        return len(self._samples.get(source, ()))
+
+    def percentile(self, source: str, percent: float) -> float | None:
+        """Phân vị `percent` (0-100) của thời gian tải, None nếu chưa có mẫu."""
+        samples = self._samples.get(source)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def stats(self) -> dict[str, Any]:
+        """Trả về p50/p95/p99 (ms) của từng nguồn để chẩn đoán."""
+        return {
+            source: {
+                "samples": len(samples),
+                **{
+                    f"p{percent}_ms": round(self.percentile(source, percent) * 1000, 1)
+                    for percent in (50, 95, 99)
+                },
+            }
+            for source, samples in self._samples.items()
+            if samples
+        }
+
+
+# Thời gian tải theo nguồn, dùng chung cho toàn bộ tiến trình
+LATENCY_TRACKER = LatencyTracker(LATENCY_WINDOW)
+
+
+def async_get_http_client(hass: HomeAssistant) -> WeatherVnHttpClient:
+    """
+    Lấy (hoặc tạo) phiên HTTP dùng chung cho phiên bản Home Assistant.
+
+    Các mục cấu hình không được gỡ khi Home Assistant dừng, nên phiên được đóng
+    theo sự kiện EVENT_HOMEASSISTANT_CLOSE (như các phiên do Home Assistant tạo).
+    """
+    client = hass.data.get(DATA_HTTP_CLIENT)
+    if client is None:
+        client = WeatherVnHttpClient()
+        hass.data[DATA_HTTP_CLIENT] = client
+
+        async def _async_close_on_stop(event: Event) -> None:
+            """Đóng phiên khi Home Assistant dừng."""
+            # Bộ lắng nghe một lần đã tự hủy đăng ký
+            client.remove_close_listener = None
+            await async_release_http_client(hass)
+
+        client.remove_close_listener = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE, _async_close_on_stop
+        )
+    return client
+
+
+async def async_release_http_client(hass: HomeAssistant) -> None:
+    """Đóng phiên HTTP dùng chung khi mục cấu hình cuối cùng bị gỡ hoặc Home Assistant dừng."""
+    client = hass.data.pop(DATA_HTTP_CLIENT, None)
+    if client is None:
+        return
+    if client.remove_close_listener is not None:
+        client.remove_close_listener()
+        client.remove_close_listener = None
+    await client.async_close()
@@ -26,6 +26,9 @@ from .const import (
     CONF_PROVINCE,
     CONF_DISTRICT,
     DOMAIN,
+    SECTION_AIR_QUALITY,
+    SECTION_LIFE,
+    SECTION_WEATHER,
 )
 from . import WeatherVnDataUpdateCoordinator
 
@@ -244,6 +247,16 @@ SENSOR_TYPES: tuple[WeatherVnSensorEntityDescription, ...] = (
 )
 
 
+# Các cảm biến lấy giá trị từ current_weather (phần dữ liệu MSN), còn lại lấy từ air_quality
+CURRENT_WEATHER_KEYS = (
+    "apparent_temperature", "uv", "sunrise", "sunset",
+    "pressure", "visibility", "wind_gust", "precipitation_amount",
+    "precipitation_accumulation", "precipitation_probability",
+    "precipitation_next_hour_amount", "precipitation_next_hour_accumulation",
+    "precipitation_today", "temp_low", "temp_high", "rain_forecast",
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ):
@@ -269,7 +282,7 @@ async def async_setup_entry(
         for day_index, forecast in enumerate(daily_forecast[:7]):
             try:
                 # Lấy ngày từ 'datetime' và định dạng lại
-                forecast_date_str = forecast.get("datetime", "")
+                forecast_date_str = forecast.datetime
                 if not forecast_date_str:
                     continue
 
@@ -462,20 +475,14 @@ class WeatherVnSensor(CoordinatorEntity, SensorEntity):
             return None
 
         key = self.entity_description.key
-        current_weather = self.coordinator.data.get("current_weather", {})
+        current_weather = self.coordinator.data.get("current_weather")
         air_quality = self.coordinator.data.get("air_quality", {})
 
         # Xử lý các loại cảm biến khác nhau
         if key == "aqi":
             return air_quality.get("title")
-        elif key in [
-            "apparent_temperature", "uv", "sunrise", "sunset",
-            "pressure", "visibility", "wind_gust", "precipitation_amount",
-            "precipitation_accumulation", "precipitation_probability",
-            "precipitation_next_hour_amount", "precipitation_next_hour_accumulation",
-            "precipitation_today", "temp_low", "temp_high", "rain_forecast"
-        ]:
-            return current_weather.get(key)
+        elif key in CURRENT_WEATHER_KEYS:
+            return getattr(current_weather, key) if current_weather else None
         elif key == "co":
             co_value = air_quality.get("co")
             if co_value is not None:
@@ -502,6 +509,8 @@ class WeatherVnSensor(CoordinatorEntity, SensorEntity):
                 attributes["level"] = aqi_level
                 attributes["description"] = air_quality.get("description", "")
 
+        section = SECTION_WEATHER if key in CURRENT_WEATHER_KEYS else SECTION_AIR_QUALITY
+        attributes.update(self.coordinator.section_attributes(section))
         return attributes
 
 
@@ -548,7 +557,10 @@ class WeatherVnLifeSensor(CoordinatorEntity, SensorEntity):
         for activity in self.coordinator.data.get("activities", []):
             if (activity.get("type") == self._activity_data.get("type") and
                     activity.get("subType") == self._activity_data.get("subType")):
-                return {"summary": activity.get("summary")}
+                return {
+                    "summary": activity.get("summary"),
+                    **self.coordinator.section_attributes(SECTION_LIFE),
+                }
         return None
 
     @property
@@ -623,7 +635,7 @@ class WeatherVnForecastSensor(CoordinatorEntity, SensorEntity):
             return None
 
         forecast = daily_forecasts[self._day_index]
-        return forecast.get(self._forecast_key)
+        return getattr(forecast, self._forecast_key)
 
     @property
     def extra_state_attributes(self):
@@ -643,4 +655,5 @@ class WeatherVnForecastSensor(CoordinatorEntity, SensorEntity):
         for key, value in forecast.items():
             if key != self._forecast_key:
                 attributes[key] = value
+        attributes.update(self.coordinator.section_attributes(SECTION_WEATHER))
         return attributes
@@ -0,0 +1,63 @@
+"""Lưu ảnh chụp dữ liệu tốt gần nhất của Weather Vn xuống đĩa."""
+from __future__ import annotations
+import datetime
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_KEY,
+    SNAPSHOT_STORAGE_VERSION,
+)
+from .models import data_from_dict, data_to_dict
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WeatherVnSnapshotStore:
+    """
+    Ảnh chụp dữ liệu tổng hợp của một mục cấu hình.
+
+    Khi khởi động, coordinator được nạp sẵn từ ảnh chụp để thực thể có dữ liệu ngay,
+    còn lần tải từ mạng chạy nền.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Khởi tạo kho lưu trữ cho mục cấu hình."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{SNAPSHOT_STORAGE_KEY}.{entry_id}"
+        )
+        self._pending: dict[str, Any] | None = None
+
+    async def async_load(self) -> tuple[dict[str, Any], datetime.datetime] | None:
+        """Đọc ảnh chụp, trả về (dữ liệu, thời điểm lưu) hoặc None nếu chưa có/hỏng."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:  # noqa: BLE001 - tệp hỏng không được chặn việc khởi động
+            _LOGGER.debug("Không đọc được ảnh chụp dữ liệu: %s", err)
+            return None
+        if not stored or not isinstance(stored.get("data"), dict):
+            return None
+        saved_at = dt_util.parse_datetime(stored.get("saved_at", ""))
+        if saved_at is None:
+            return None
+        return data_from_dict(stored["data"]), saved_at
+
+    def async_schedule_save(self, data: dict[str, Any]) -> None:
+        """Hẹn lưu dữ liệu mới; các lần gọi liên tiếp được gộp thành một lần ghi."""
+        self._pending = {"saved_at": dt_util.utcnow().isoformat(), "data": data}
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Nội dung sẽ được ghi xuống đĩa; các bản ghi được chuyển sang dict thuần khi ghi."""
+        if self._pending is None:
+            return {}
+        return {**self._pending, "data": data_to_dict(self._pending["data"])}
+
+    async def async_remove(self) -> None:
+        """Xóa ảnh chụp khi mục cấu hình bị xóa."""
+        await self._store.async_remove()
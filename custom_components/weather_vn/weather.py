@@ -1,6 +1,7 @@
 """Nền tảng thời tiết để tích hợp Weather Vn."""
 from __future__ import annotations
 import logging
+from typing import Any
 from homeassistant.components.weather import (
     WeatherEntity,
     WeatherEntityFeature,
@@ -13,7 +14,7 @@ from homeassistant.const import (
     UnitOfSpeed,
     UnitOfLength,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
@@ -21,8 +22,10 @@ from .const import (
     ATTRIBUTION,
     CONDITION_CLASSES,
     DOMAIN,
+    SECTION_WEATHER,
 )
 from . import WeatherVnDataUpdateCoordinator
+from .models import CurrentWeather
 from .sensor import get_device_info
 
 _LOGGER = logging.getLogger(__name__)
@@ -56,97 +59,114 @@ class WeatherVnWeather(CoordinatorEntity, WeatherEntity):
         self._attr_name = f"{coordinator.district.capitalize()}"
         self._attr_unique_id = f"weathervn-{coordinator.province}-{coordinator.district}"
         self._attr_device_info = get_device_info(coordinator.province, coordinator.district)
+        # Dự báo đã chuyển sang dạng của HA, giữ cho tới khi coordinator có dữ liệu mới
+        self._forecast_cache: dict[str, list[Forecast]] = {}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Bỏ các dự báo đã chuyển đổi khi coordinator có dữ liệu mới."""
+        self._forecast_cache.clear()
+        super()._handle_coordinator_update()
 
     @property
     def available(self) -> bool:
         """Trả về true nếu coordinator có dữ liệu."""
         return self.coordinator.data is not None
 
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Trả về thời điểm tải, trạng thái cũ và tuổi ảnh chụp của dữ liệu thời tiết."""
+        return self.coordinator.section_attributes(SECTION_WEATHER)
+
+    @property
+    def _current(self) -> CurrentWeather | None:
+        """Bản ghi thời tiết hiện tại, None nếu chưa có dữ liệu."""
+        if not self.available:
+            return None
+        return self.coordinator.data.get("current_weather") or None
+
     @property
     def condition(self) -> str | None:
         """Trả về điều kiện thời tiết hiện tại."""
-        if not self.available:
+        current = self._current
+        if current is None:
             return None
-        condition_text = self.coordinator.data.get("current_weather", {}).get("condition", "").lower()
-        return CONDITION_CLASSES.get(condition_text)
+        return CONDITION_CLASSES.get((current.condition or "").lower())
 
     @property
     def native_temperature(self) -> float | None:
         """Trả về nhiệt độ hiện tại."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("temperature")
+        current = self._current
+        return current.temperature if current is not None else None
 
     @property
     def native_temperature_high(self) -> float | None:
         """Trả về nhiệt độ cao nhất hôm nay."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("temp_high")
+        current = self._current
+        return current.temp_high if current is not None else None
 
     @property
     def native_temperature_low(self) -> float | None:
         """Trả về nhiệt độ thấp nhất hôm nay."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("temp_low")
+        current = self._current
+        return current.temp_low if current is not None else None
 
     @property
     def humidity(self) -> float | None:
         """Trả về độ ẩm."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("humidity")
+        current = self._current
+        return current.humidity if current is not None else None
 
     @property
     def native_wind_speed(self) -> float | None:
         """Trả về tốc độ gió."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("wind_speed")
+        current = self._current
+        return current.wind_speed if current is not None else None
 
     @property
     def native_pressure(self) -> float | None:
         """Trả về áp suất."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("pressure")
+        current = self._current
+        return current.pressure if current is not None else None
 
     @property
     def native_visibility(self) -> float | None:
         """Trả về tầm nhìn."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("visibility")
+        current = self._current
+        return current.visibility if current is not None else None
 
     @property
     def native_precipitation_value(self) -> float | None:
         """Trả về lượng mưa hiện tại (lấy từ dự báo 2 giờ)."""
-        if not self.available:
-            return None
-        return self.coordinator.data.get("current_weather", {}).get("precipitation_amount")
+        current = self._current
+        return current.precipitation_amount if current is not None else None
 
     @property
     def forecast_daily(self) -> list[Forecast] | None:
         """Trả về dự báo thời tiết hàng ngày."""
         if not self.available or not self.coordinator.data.get("daily_forecast"):
             return None
+        if "daily" not in self._forecast_cache:
+            self._forecast_cache["daily"] = self._convert_daily_forecast()
+        return self._forecast_cache["daily"]
 
+    def _convert_daily_forecast(self) -> list[Forecast]:
+        """Chuyển dự báo hàng ngày của coordinator sang dạng của HA."""
         ha_forecasts: list[Forecast] = []
         for forecast in self.coordinator.data["daily_forecast"]:
-            condition_text = (forecast.get("condition") or "").lower()
+            condition_text = (forecast.condition or "").lower()
             condition = CONDITION_CLASSES.get(condition_text, "exceptional")
 
             ha_forecasts.append(
                 {
-                    "datetime": forecast.get("datetime"),
+                    "datetime": forecast.datetime,
                     "condition": condition,
-                    "native_temperature": forecast.get("temp_high"),
-                    "native_templow": forecast.get("temp_low"),
-                    "native_precipitation_value": forecast.get("precipitation"),
-                    "precipitation_probability": forecast.get("precipitation_probability"),
-                    "humidity": forecast.get("humidity"),
-                    "native_wind_speed": forecast.get("wind_speed"),
+                    "native_temperature": forecast.temp_high,
+                    "native_templow": forecast.temp_low,
+                    "native_precipitation_value": forecast.precipitation,
+                    "precipitation_probability": forecast.precipitation_probability,
+                    "humidity": forecast.humidity,
+                    "native_wind_speed": forecast.wind_speed,
                 }
             )
         return ha_forecasts
@@ -160,22 +180,35 @@ class WeatherVnWeather(CoordinatorEntity, WeatherEntity):
         """Trả về dự báo thời tiết hàng giờ."""
         if not self.available or not self.coordinator.data.get("hourly_forecast"):
             return None
-
+        if "hourly" not in self._forecast_cache:
+            self._forecast_cache["hourly"] = self._convert_hourly_forecast()
+        return self._forecast_cache["hourly"]
+
+    def _convert_hourly_forecast(self) -> list[Forecast]:
+        """Chuyển dự báo hàng giờ (lưu theo cột) của coordinator sang dạng của HA."""
+        # Đọc thẳng từ các cột, không dựng bản ghi trung gian cho từng giờ
+        hourly = self.coordinator.data["hourly_forecast"]
         ha_forecasts: list[Forecast] = []
-        for forecast in self.coordinator.data["hourly_forecast"]:
-            condition_text = (forecast.get("condition") or "").lower()
-            condition = CONDITION_CLASSES.get(condition_text, "exceptional")
+        for dt, condition_text, temperature, apparent, humidity, probability, wind_speed in zip(
+            hourly.datetime,
+            hourly.condition,
+            hourly.values("temperature"),
+            hourly.values("apparent_temperature"),
+            hourly.values("humidity"),
+            hourly.values("precipitation_probability"),
+            hourly.values("wind_speed"),
+        ):
+            condition = CONDITION_CLASSES.get((condition_text or "").lower(), "exceptional")
 
             ha_forecasts.append(
                 {
-                    "datetime": forecast.get("datetime"),
+                    "datetime": dt,
                     "condition": condition,
-                    "native_temperature": forecast.get("temperature"),
-                    "native_apparent_temperature": forecast.get("apparent_temperature"),
-                    "humidity": forecast.get("humidity"),
-                    "precipitation_probability": forecast.get("precipitation_probability"),
-                    "native_wind_speed": forecast.get("wind_speed"),
-                    "native_precipitation_value": forecast.get("precipitation"),
+                    "native_temperature": temperature,
+                    "native_apparent_temperature": apparent,
+                    "humidity": humidity,
+                    "precipitation_probability": probability,
+                    "native_wind_speed": wind_speed,
                 }
             )
         return ha_forecasts
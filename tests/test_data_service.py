@@ -0,0 +1,177 @@
+"""Kiểm tra toàn bộ đường tải trang MSN: _read_redux_payload -> _conditional_get -> get_data."""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.weather_vn import data_service  # noqa: E402
+from custom_components.weather_vn.const import PARSE_BACKEND_PROCESS  # noqa: E402
+from custom_components.weather_vn.data_service import WeatherVnDataService  # noqa: E402
+from custom_components.weather_vn.executor import WeatherVnParseExecutor  # noqa: E402
+from custom_components.weather_vn.network import ResponseCache, ValidatorCache  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class _FakeContent:
+    """Luồng nội dung phản hồi, đủ cho iter_chunked và read như aiohttp."""
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+        self._pos = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        end = len(self._body) if size < 0 else self._pos + size
+        chunk = self._body[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+    async def iter_chunked(self, size: int):
+        while chunk := await self.read(size):
+            yield chunk
+
+
+class _FakeResponse:
+    """Phản hồi 200 với nội dung cố định."""
+
+    status = 200
+
+    def __init__(self, body: bytes) -> None:
+        self.content = _FakeContent(body)
+        self.content_length = len(body)
+        self.headers = {}
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def text(self) -> str:
+        return (await self.content.read()).decode("utf-8")
+
+    def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+
+class _FakeSession:
+    """Phiên trả về trang đã ghi lại cho mọi URL của MSN và trang rỗng cho dbtt."""
+
+    def __init__(self, msn_page: bytes) -> None:
+        self._msn_page = msn_page
+        self.urls: list[str] = []
+
+    def get(self, url: str, **kwargs) -> _FakeResponse:
+        self.urls.append(url)
+        if "msn.com" in url:
+            return _FakeResponse(self._msn_page)
+        return _FakeResponse(b"<html><body></body></html>")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches(monkeypatch):
+    """Mỗi lần kiểm tra dùng bộ nhớ đệm phản hồi riêng để thực sự đi qua đường tải."""
+    monkeypatch.setattr(data_service, "RESPONSE_CACHE", ResponseCache({"msn.com": 120}, 8, 1 << 20))
+    monkeypatch.setattr(data_service, "VALIDATOR_CACHE", ValidatorCache())
+
+
+def _recorded_page() -> bytes:
+    """Trang dự báo MSN đã ghi lại."""
+    with open(os.path.join(FIXTURES, "msn_forecast.html"), "rb") as f:
+        return f.read()
+
+
+def test_get_data_from_recorded_msn_page():
+    """Trang MSN ở dạng bytes phải đi hết đường tải và cho ra dữ liệu thời tiết đầy đủ."""
+    page = _recorded_page()
+    session = _FakeSession(page)
+    service = WeatherVnDataService("ha-noi", "ba-dinh", session=session)
+
+    data = asyncio.run(service.get_data())
+
+    assert service.msn_url in session.urls
+    current = data["current_weather"]
+    assert current.temperature == 29.0
+    assert current.condition == "Có mây"
+    assert current.wind_speed == 11 / 3.6
+    assert current.sunrise == "05:20:00"
+    assert len(data["hourly_forecast"]) == 48
+    assert data["hourly_forecast"][0].temperature == 26.0
+    assert len(data["daily_forecast"]) == 5
+    assert data["daily_forecast"][0].precipitation == 4.0
+    assert [item["name"] for item in data["activities"]] == ["Chỉ số UV"]
+    assert data["stale_sections"] == []
+
+
+def test_process_pool_counters_reach_main_process():
+    """Bộ đếm giải mã tăng trong tiến trình con phải được cộng vào bộ đếm của tiến trình chính."""
+    executor = WeatherVnParseExecutor(1, PARSE_BACKEND_PROCESS)
+    assert executor.active_backend == PARSE_BACKEND_PROCESS
+    service = WeatherVnDataService(
+        "ha-noi", "ba-dinh", session=_FakeSession(_recorded_page()),
+        parse_executor=executor,
+    )
+    before = dict(data_service.DECODE_STATS)
+    try:
+        data = asyncio.run(service.get_data())
+    finally:
+        executor.shutdown()
+
+    assert data["current_weather"].temperature == 29.0
+    decoded = sum(data_service.DECODE_STATS.values()) - sum(before.values())
+    # Một lần cho trang dự báo, một lần cho trang life
+    assert decoded == 2
+
+
+def test_selective_decode_skips_strings_and_falls_back_past_scan_limit():
+    """Chuỗi có dấu nháy thoát được bỏ qua đúng; nhánh nằm quá xa thì giải mã toàn bộ."""
+    weather = {"_@STATE@_": {"forecast": [{"hourly": [{"temperature": 26}]}]}}
+    tricky = {"a": 'có \\" và "WeatherData": {} \\\\', "b": ["}", "{", "]"]}
+    text = json.dumps({"Tricky": tricky, "WeatherData": weather}, ensure_ascii=False)
+    expected = {"WeatherData": json.loads(text)["WeatherData"]}
+
+    assert data_service._decode_selected(text, data_service._MSN_WEATHER_PATHS) == expected
+
+    pad = "x" * data_service.SELECTIVE_DECODE_MAX_SCAN
+    padded = json.dumps({"Pad": pad, "WeatherData": weather})
+    assert data_service._decode_selected(padded, data_service._MSN_WEATHER_PATHS) is None
+    before = dict(data_service.DECODE_STATS)
+    decoded = data_service._decode_redux(padded, data_service._MSN_WEATHER_PATHS)
+    assert decoded["WeatherData"] == weather
+    assert data_service.DECODE_STATS["full"] == before["full"] + 1
+
+
+def test_refresh_deadline_starts_after_rate_limiter_wait(monkeypatch):
+    """Thời gian chờ lượt ở bộ giới hạn tốc độ không bị tính vào thời hạn làm mới."""
+
+    class _SlowLimiter:
+        async def acquire(self, url):
+            await asyncio.sleep(0.15)
+
+    class _SlowResponse(_FakeResponse):
+        async def __aenter__(self):
+            await asyncio.sleep(0.1)
+            return self
+
+    class _SlowSession(_FakeSession):
+        def get(self, url: str, **kwargs) -> _FakeResponse:
+            response = super().get(url, **kwargs)
+            response.__class__ = _SlowResponse
+            return response
+
+    monkeypatch.setattr(data_service, "RATE_LIMITER", _SlowLimiter())
+    # Chờ lượt 0.15 giây + tải 0.1 giây vượt thời hạn, nhưng mỗi phần đều nằm trong thời hạn
+    monkeypatch.setattr(data_service, "REFRESH_DEADLINE", 0.2)
+    service = WeatherVnDataService("ha-noi", "ba-dinh", session=_SlowSession(_recorded_page()))
+
+    data = asyncio.run(service.get_data())
+
+    assert data["current_weather"].temperature == 29.0
+    assert data["stale_sections"] == []
@@ -0,0 +1,72 @@
+"""Kiểm tra các bộ phân tích HTML cho cùng kết quả và bộ đã chọn được dùng ở mọi bước."""
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.weather_vn import data_service  # noqa: E402
+from custom_components.weather_vn.const import (  # noqa: E402
+    HTML_PARSER_HTMLPARSER,
+    HTML_PARSER_LXML,
+    HTML_PARSER_SELECTOLAX,
+)
+from custom_components.weather_vn.html_parser import available_backends  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+BACKENDS = (HTML_PARSER_SELECTOLAX, HTML_PARSER_LXML, HTML_PARSER_HTMLPARSER)
+
+
+def _require(backend: str) -> None:
+    """Bỏ qua khi bộ phân tích chưa được cài đặt."""
+    if backend not in available_backends():
+        pytest.skip(f"{backend} chưa được cài đặt")
+
+
+def _aqi_page() -> str:
+    """Trang AQI của dbtt đã ghi lại."""
+    with open(os.path.join(FIXTURES, "dbtt_aqi.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_air_quality_identical_on_every_backend(backend):
+    """Mọi bộ phân tích phải cho ra đúng kết quả AQI của html.parser (bộ luôn có sẵn)."""
+    _require(backend)
+    page = _aqi_page()
+    expected = data_service._parse_air_quality(page, HTML_PARSER_HTMLPARSER)
+    assert expected["pm2_5"] == 38.6
+    assert expected["no2"] == 21.9
+    assert expected["title"] == "Trung bình"
+
+    assert data_service._parse_air_quality(page, backend) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_redux_dom_fallback_uses_configured_backend(backend, monkeypatch):
+    """Khi cách tìm chuỗi không khớp, trang MSN được dựng DOM bằng bộ phân tích đã chọn."""
+    _require(backend)
+    used = []
+    parse_html = data_service.parse_html
+
+    def recording_parse_html(html, chosen):
+        used.append(chosen)
+        return parse_html(html, chosen)
+
+    monkeypatch.setattr(data_service, "parse_html", recording_parse_html)
+    # Dấu '>' trong giá trị thuộc tính làm mẫu nhanh không khớp thẻ mở
+    page = b"""<html><body><script data-note='a>b' id="redux-data">{"a": 1}</script></body></html>"""
+
+    class _Content:
+        async def iter_chunked(self, size):
+            yield page
+
+    class _Response:
+        content = _Content()
+
+    payload = asyncio.run(data_service._read_redux_payload(_Response(), backend))
+
+    assert payload == b'{"a": 1}'
+    assert used == [backend]
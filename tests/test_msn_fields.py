@@ -0,0 +1,28 @@
+"""Kiểm tra bộ phân tích số theo cột của bảng ánh xạ MSN."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.weather_vn.msn_fields import (  # noqa: E402
+    CM_TO_MM,
+    HOURLY_FIELD_MAP,
+    KMH_PER_MS,
+    parse_numeric_column,
+)
+
+
+def test_unit_conversion_matches_scalar_arithmetic():
+    """Đổi đơn vị theo cột phải cho đúng từng bit như `/ 3.6` và `* 10` của cách cũ."""
+    raw = list(range(300)) + [f"{value} km/h" for value in range(300)]
+    expected = [float(value) / 3.6 for value in range(300)] * 2
+
+    assert parse_numeric_column(raw, divisor=KMH_PER_MS, default=0) == expected
+    assert parse_numeric_column([0.3, "0.7", None], CM_TO_MM, default=0) == [0.3 * 10, 0.7 * 10, 0.0]
+
+
+def test_hourly_map_wind_speed_is_divided():
+    """Tốc độ gió hàng giờ đi qua bảng ánh xạ cũng là phép chia cho 3.6."""
+    columns = HOURLY_FIELD_MAP.columns([{"windSpeed": 7}, {"windSpeed": "7 km/h"}, {}])
+
+    assert columns["wind_speed"] == [7 / 3.6, 7 / 3.6, 0.0]
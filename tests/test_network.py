@@ -0,0 +1,90 @@
+"""Kiểm tra lớp mạng dùng chung: bộ ngắt mạch theo máy chủ và phiên HTTP dùng chung."""
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.weather_vn.const import (  # noqa: E402
+    CIRCUIT_STATE_HALF_OPEN,
+    CIRCUIT_STATE_OPEN,
+)
+from custom_components.weather_vn.const import DATA_HTTP_CLIENT  # noqa: E402
+from custom_components.weather_vn.network import (  # noqa: E402
+    CircuitBreaker,
+    async_get_http_client,
+    async_release_http_client,
+)
+
+
+async def _failing_request(breaker: CircuitBreaker) -> None:
+    """Một yêu cầu bị lỗi kết nối sau một khoảng ngắn."""
+    async with breaker.guard():
+        await asyncio.sleep(0.01)
+        raise aiohttp.ClientConnectionError()
+
+
+def test_in_flight_failures_do_not_extend_backoff():
+    """Lỗi của các yêu cầu đang chạy khi mạch mở chỉ được đếm; chỉ yêu cầu thử làm tăng thời gian mở."""
+    breaker = CircuitBreaker("msn.com", 3, 60, 1800, 1)
+
+    async def run() -> None:
+        await asyncio.gather(
+            *(_failing_request(breaker) for _ in range(10)), return_exceptions=True
+        )
+        assert breaker.state == CIRCUIT_STATE_OPEN
+        assert breaker.stats()["consecutive_failures"] == 10
+        assert 30 <= breaker.seconds_until_probe <= 60
+
+        # Hết thời gian mở: yêu cầu thử thất bại thì thời gian mở tăng gấp đôi
+        breaker._open_until = time.monotonic()
+        assert breaker.state == CIRCUIT_STATE_HALF_OPEN
+        await asyncio.gather(_failing_request(breaker), return_exceptions=True)
+        assert breaker.state == CIRCUIT_STATE_OPEN
+        assert 60 <= breaker.seconds_until_probe <= 120
+
+    asyncio.run(run())
+    assert breaker.stats()["opened"] == 1
+
+
+class _FakeBus:
+    """Bus sự kiện chỉ đủ cho async_listen_once."""
+
+    def __init__(self) -> None:
+        self.listeners = {}
+
+    def async_listen_once(self, event_type, listener):
+        self.listeners[event_type] = listener
+        return lambda: self.listeners.pop(event_type)
+
+
+class _FakeHass:
+    """Đối tượng hass tối thiểu cho phiên HTTP dùng chung."""
+
+    def __init__(self) -> None:
+        self.data = {}
+        self.bus = _FakeBus()
+
+
+def test_shared_session_closed_when_home_assistant_stops():
+    """Mục cấu hình không được gỡ lúc dừng: phiên phải đóng theo sự kiện đóng của Home Assistant."""
+    hass = _FakeHass()
+
+    async def run() -> None:
+        client = async_get_http_client(hass)
+        assert async_get_http_client(hass) is client
+        await hass.bus.listeners[EVENT_HOMEASSISTANT_CLOSE](None)
+        assert client.session.closed
+        assert DATA_HTTP_CLIENT not in hass.data
+
+        # Gỡ mục cấu hình cuối cùng cũng hủy đăng ký bộ lắng nghe của phiên mới
+        client = async_get_http_client(hass)
+        await async_release_http_client(hass)
+        assert client.session.closed
+        assert not hass.bus.listeners
+
+    asyncio.run(run())
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Đo hiệu năng các bước xử lý trang MSN trên các trang HTML đã lưu sẵn.
+
+Cách dùng:
+    python tools/benchmark_msn.py stream trang1.html trang2.html ...
+    python tools/benchmark_msn.py extract trang1.html trang2.html ...
+    python tools/benchmark_msn.py throughput --workers 4 trang1.html trang2.html ...
+    python tools/benchmark_msn.py decode [trang1.html trang2.html ...]
+    python tools/benchmark_msn.py parsers --msn msn1.html --dbtt dbtt1.html ...
+    python tools/benchmark_msn.py records trang1.html trang2.html ...
+    python tools/benchmark_msn.py numeric [trang1.html trang2.html ...]
+
+Cần chạy trong môi trường đã cài Home Assistant (để nhập được tích hợp).
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.weather_vn.data_service import (  # noqa: E402
+    STREAM_CHUNK_SIZE,
+    _ReduxStreamExtractor,
+    _MSN_WEATHER_PATHS,
+    _decode_msn_weather,
+    _decode_redux,
+    _decode_selected,
+    _extract_redux_payload,
+    _parse_air_quality,
+)
+from custom_components.weather_vn.html_parser import (  # noqa: E402
+    available_backends,
+    parse_html,
+)
+from custom_components.weather_vn.msn_fields import (  # noqa: E402
+    CM_TO_MM,
+    KMH_PER_MS,
+    parse_numeric_column,
+)
+
+
+def _measure(func, *args):
+    """Chạy hàm một lần, trả về (kết quả, thời gian ms, bộ nhớ đỉnh KB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024
+
+
+def _full_page(raw):
+    """Cách cũ: giải mã toàn bộ trang rồi tìm thẻ bằng BeautifulSoup."""
+    soup = BeautifulSoup(raw.decode("utf-8"), "html.parser")
+    script = soup.find("script", {"id": "redux-data"})
+    return len(raw), script.string if script else None
+
+
+def _streamed(raw):
+    """Cách mới: nạp từng khối cho tới khi gặp thẻ đóng của redux-data."""
+    extractor = _ReduxStreamExtractor()
+    for offset in range(0, len(raw), STREAM_CHUNK_SIZE):
+        payload = extractor.feed(raw[offset:offset + STREAM_CHUNK_SIZE])
+        if payload is not None:
+            return extractor.bytes_seen, payload.decode("utf-8")
+    return extractor.bytes_seen, None
+
+
+def bench_stream(paths):
+    """So sánh số byte phải đọc, thời gian và bộ nhớ đỉnh của hai cách."""
+    print(f"{'Trang':30} {'Cách':8} {'Byte đọc':>10} {'ms':>8} {'KB đỉnh':>9}")
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        name = os.path.basename(path)[:30]
+        results = {}
+        for label, func in (("full", _full_page), ("stream", _streamed)):
+            (bytes_read, payload), elapsed, peak = _measure(func, raw)
+            results[label] = payload
+            print(f"{name:30} {label:8} {bytes_read:>10} {elapsed:>8.1f} {peak:>9.0f}")
+        if results["full"] != results["stream"]:
+            print(f"  CẢNH BÁO: nội dung trích xuất khác nhau ở {name}")
+
+
+def _bs4_extract(html):
+    """Tìm thẻ bằng cây DOM đầy đủ của BeautifulSoup."""
+    script = BeautifulSoup(html, "html.parser").find("script", {"id": "redux-data"})
+    return script.string if script else None
+
+
+def bench_extract(paths, rounds=20):
+    """So sánh thời gian tìm nội dung redux-data: cây DOM so với cắt chuỗi."""
+    print(f"{'Trang':30} {'KB':>7} {'bs4 ms':>9} {'chuỗi ms':>9} {'nhanh hơn':>10}")
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        timings = {}
+        for label, func in (("bs4", _bs4_extract), ("fast", _extract_redux_payload)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                payload = func(html)
+            timings[label] = (time.perf_counter() - start) * 1000 / rounds
+            timings[f"{label}_payload"] = payload
+        name = os.path.basename(path)[:30]
+        print(
+            f"{name:30} {len(html) / 1024:>7.0f} {timings['bs4']:>9.2f} "
+            f"{timings['fast']:>9.3f} {timings['bs4'] / max(timings['fast'], 1e-6):>9.0f}x"
+        )
+        if timings["bs4_payload"] != timings["fast_payload"]:
+            print(f"  CẢNH BÁO: nội dung trích xuất khác nhau ở {name}")
+
+
+def _parse_page(raw):
+    """Toàn bộ bước phân tích một trang: bytes thô vào, kết quả gọn ra."""
+    payload = _extract_redux_payload(raw.decode("utf-8"))
+    return _decode_msn_weather(payload) if payload else None
+
+
+def bench_throughput(paths, workers, rounds=10):
+    """Đo số trang phân tích được mỗi giây: tại chỗ, nhóm luồng và nhóm tiến trình."""
+    corpus = []
+    for path in paths:
+        with open(path, "rb") as f:
+            corpus.append(f.read())
+    jobs = corpus * rounds
+
+    print(f"{len(jobs)} trang, {workers} worker, {os.cpu_count()} lõi CPU")
+    start = time.perf_counter()
+    for raw in jobs:
+        _parse_page(raw)
+    inline = time.perf_counter() - start
+    print(f"{'tại chỗ':10} {len(jobs) / inline:>8.1f} trang/giây")
+
+    pools = (
+        ("luồng", lambda: ThreadPoolExecutor(max_workers=workers)),
+        ("tiến trình", lambda: ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )),
+    )
+    for label, factory in pools:
+        with factory() as pool:
+            # Khởi động trước để không tính thời gian tạo worker
+            list(pool.map(_parse_page, corpus[:1] * workers))
+            start = time.perf_counter()
+            list(pool.map(_parse_page, jobs))
+            elapsed = time.perf_counter() - start
+        print(f"{label:10} {len(jobs) / elapsed:>8.1f} trang/giây ({inline / elapsed:.1f}x)")
+
+
+def _memory(func, *args):
+    """Chạy hàm dưới tracemalloc, trả về (ms, KB đỉnh, KB còn giữ, số khối còn giữ)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = (time.perf_counter() - start) * 1000
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = snapshot.statistics("filename")
+    retained = sum(stat.size for stat in stats)
+    blocks = sum(stat.count for stat in stats)
+    del result
+    return elapsed, peak / 1024, retained / 1024, blocks
+
+
+def _synthetic_redux(prefix):
+    """Cây redux giả lập: các khối `prefix` đứng trước nhánh WeatherData (trường hợp xấu nhất)."""
+    weather = {"_@STATE@_": {"forecast": [{"hourly": [{"temperature": i} for i in range(48)]}]}}
+    return json.dumps({**prefix, "WeatherData": weather}, ensure_ascii=False)
+
+
+def _decode_corpus(paths):
+    """Các payload redux của trang đã lưu, cùng hai trường hợp giả lập có phần đầu ~2 MB."""
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            corpus.append((os.path.basename(path)[:30], _extract_redux_payload(f.read())))
+    text = 'Nội dung "trích dẫn" \\ và {ngoặc} [vuông] '
+    strings = {f"Block{i}": {"html": text * 470, "items": [text] * 5} for i in range(100)}
+    tokens = {
+        f"Block{i}": [{"id": j, "name": "x", "v": [1, 2, 3]} for j in range(500)]
+        for i in range(100)
+    }
+    corpus.append(("giả lập: đầu nhiều chuỗi", _synthetic_redux(strings)))
+    corpus.append(("giả lập: đầu nhiều token", _synthetic_redux(tokens)))
+    return corpus
+
+
+def bench_decode(paths, rounds=5):
+    """
+    So sánh json.loads toàn bộ với giải mã chọn lọc nhánh WeatherData._@STATE@_.
+
+    "quét hết" là giải mã chọn lọc không giới hạn vùng quét; "tích hợp" là đường thật
+    (_decode_redux), chuyển sang json.loads khi nhánh nằm sau SELECTIVE_DECODE_MAX_SCAN ký tự.
+    Thời gian đo riêng, ngoài tracemalloc (tracemalloc làm chậm nhiều lần khi có nhiều khối).
+    """
+    print(f"{'Trang':30} {'Cách':10} {'ms':>8} {'KB đỉnh':>9} {'KB giữ':>8} {'khối':>8}")
+    for name, text in _decode_corpus(paths):
+        if text is None:
+            print(f"{name:30} không có redux-data")
+            continue
+        for label, func, args in (
+            ("json.loads", json.loads, (text,)),
+            ("quét hết", _decode_selected, (text, _MSN_WEATHER_PATHS, len(text))),
+            ("tích hợp", _decode_redux, (text, _MSN_WEATHER_PATHS)),
+        ):
+            _, peak, retained, blocks = _memory(func, *args)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                func(*args)
+            elapsed = (time.perf_counter() - start) * 1000 / rounds
+            print(f"{name:30} {label:10} {elapsed:>8.2f} {peak:>9.0f} {retained:>8.0f} {blocks:>8}")
+
+
+def _msn_script(html, backend):
+    """Tìm thẻ redux-data trong trang MSN bằng bộ phân tích đã chọn."""
+    node = parse_html(html, backend).select_one("script#redux-data")
+    return node.text if node else None
+
+
+def bench_parsers(msn_pages, dbtt_pages, rounds=10):
+    """Ma trận thời gian: bộ phân tích HTML x loại trang; kiểm tra kết quả giống nhau."""
+    backends = available_backends()
+    print("Bộ phân tích đã cài:", ", ".join(backends))
+    print(f"{'Trang':30} {'Loại':5} " + " ".join(f"{b + ' ms':>16}" for b in backends))
+    cases = [(path, "msn", _msn_script) for path in msn_pages or []]
+    cases += [(path, "dbtt", _parse_air_quality) for path in dbtt_pages or []]
+    for path, kind, func in cases:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        timings, results = [], {}
+        for backend in backends:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                results[backend] = func(html, backend)
+            timings.append((time.perf_counter() - start) * 1000 / rounds)
+        name = os.path.basename(path)[:30]
+        print(f"{name:30} {kind:5} " + " ".join(f"{t:>16.2f}" for t in timings))
+        reference = results[backends[-1]]
+        for backend in backends[:-1]:
+            if results[backend] != reference:
+                print(f"  CẢNH BÁO: {backend} cho kết quả khác html.parser ở {name}")
+
+
+def bench_records(paths):
+    """So sánh số byte mỗi mục của bản ghi __slots__ và cột hàng giờ với dict tương đương."""
+    print(f"{'Trang':30} {'Phần':16} {'Số mục':>7} {'B/mục dict':>11} {'B/mục bản ghi':>14}")
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            payload = _extract_redux_payload(f.read())
+        if payload is None:
+            print(f"{os.path.basename(path)[:30]:30} không có redux-data")
+            continue
+        result = _decode_msn_weather(payload)
+        name = os.path.basename(path)[:30]
+        sections = {
+            "current_weather": [result["current_weather"]],
+            "daily_forecast": result["daily_forecast"],
+        }
+        for section, records in sections.items():
+            if not records:
+                continue
+            as_dicts = [record.to_dict() for record in records]
+            per_dict = sum(sys.getsizeof(item) for item in as_dicts) / len(records)
+            per_record = sum(sys.getsizeof(item) for item in records) / len(records)
+            print(f"{name:30} {section:16} {len(records):>7} {per_dict:>11.0f} {per_record:>14.0f}")
+        _print_hourly_columns(name, result["hourly_forecast"])
+
+
+def _print_hourly_columns(name, hourly):
+    """So sánh các trường số của dự báo hàng giờ: danh sách dict so với lưu theo cột."""
+    if not hourly:
+        return
+    fields = hourly.NUMERIC_FIELDS
+    as_dicts = [{field: row[field] for field in fields} for row in hourly]
+    # Dict cùng các đối tượng float bên trong, cộng danh sách chứa chúng
+    dict_bytes = sys.getsizeof(as_dicts) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values() if value is not None)
+        for row in as_dicts
+    )
+    column_bytes = sum(sys.getsizeof(getattr(hourly, field)) for field in fields)
+    print(
+        f"{name:30} {'hourly (số)':16} {len(hourly):>7} "
+        f"{dict_bytes / len(hourly):>11.0f} {column_bytes / len(hourly):>14.0f} (cột)"
+    )
+
+
+# (khóa MSN, hệ số nhân, số chia, mặc định) của các cột số trong một giờ dự báo
+_HOURLY_NUMERIC = (
+    ("temperature", 1.0, 1.0, None),
+    ("feels", 1.0, 1.0, None),
+    ("humidity", 1.0, 1.0, None),
+    ("precipitation", 1.0, 1.0, 0),
+    ("windSpeed", 1.0, KMH_PER_MS, 0),
+    ("rainAmount", CM_TO_MM, 1.0, 0),
+)
+
+
+def _legacy_numeric(value, default=None):
+    """Cách cũ: re.search với mẫu chưa biên dịch cho từng giá trị."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = re.search(r"^-?\d+\.?\d*", value)
+        if match:
+            return float(match.group())
+    if default is not None:
+        return float(default)
+    return None
+
+
+def _synthetic_hours(days=10):
+    """Các giờ dự báo giả lập giống dữ liệu MSN: lẫn số và chuỗi có đơn vị."""
+    return [
+        {
+            "temperature": 24 + hour % 8,
+            "feels": f"{27 + hour % 6}°",
+            "humidity": f"{70 + hour % 20}%",
+            "precipitation": str(hour * 3 % 100),
+            "windSpeed": f"{hour % 15} km/h",
+            "rainAmount": 0.1 * (hour % 4),
+        }
+        for hour in range(days * 24)
+    ]
+
+
+def _page_hours(path):
+    """Các giờ dự báo thô trong một trang MSN đã lưu."""
+    with open(path, encoding="utf-8") as f:
+        payload = _extract_redux_payload(f.read())
+    if payload is None:
+        return []
+    state = json.loads(payload).get("WeatherData", {}).get("_@STATE@_", {})
+    return [hour for day in state.get("forecast", []) for hour in day.get("hourly", [])]
+
+
+def bench_numeric(paths, rounds=200):
+    """So sánh phân tích số từng giá trị (cách cũ) với phân tích theo cột một lượt."""
+    corpus = [(os.path.basename(path)[:30], _page_hours(path)) for path in paths]
+    if not corpus:
+        corpus = [("giả lập 10 ngày", _synthetic_hours())]
+    print(f"{'Nguồn':30} {'Giá trị':>8} {'cũ µs':>9} {'cột µs':>9} {'nhanh hơn':>10}")
+    for name, hours in corpus:
+        if not hours:
+            print(f"{name:30} không có dự báo hàng giờ")
+            continue
+        columns = [([hour.get(key) for hour in hours], scale, divisor, default)
+                   for key, scale, divisor, default in _HOURLY_NUMERIC]
+
+        def legacy():
+            return [
+                [_legacy_numeric(value, default) * scale / divisor if default is not None
+                 else _legacy_numeric(value) for value in values]
+                for values, scale, divisor, default in columns
+            ]
+
+        def batched():
+            return [
+                parse_numeric_column(values, scale, divisor, default)
+                for values, scale, divisor, default in columns
+            ]
+
+        timings = {}
+        for label, func in (("legacy", legacy), ("batch", batched)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                func()
+            timings[label] = (time.perf_counter() - start) * 1e6 / rounds
+        count = len(hours) * len(columns)
+        print(
+            f"{name:30} {count:>8} {timings['legacy']:>9.0f} {timings['batch']:>9.0f} "
+            f"{timings['legacy'] / max(timings['batch'], 1e-9):>9.1f}x"
+        )
+
+
+def main():
+    """Hàm chính."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stream", help="Đọc luồng so với tải cả trang").add_argument(
+        "pages", nargs="+"
+    )
+    sub.add_parser("extract", help="Cắt chuỗi so với BeautifulSoup").add_argument(
+        "pages", nargs="+"
+    )
+    throughput = sub.add_parser("throughput", help="Thông lượng theo số lõi CPU")
+    throughput.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    throughput.add_argument("pages", nargs="+")
+    sub.add_parser("decode", help="Giải mã chọn lọc so với json.loads").add_argument(
+        "pages", nargs="*", help="Các trang MSN đã lưu (luôn chạy thêm hai trường hợp giả lập)"
+    )
+    parsers = sub.add_parser("parsers", help="Ma trận bộ phân tích HTML x loại trang")
+    parsers.add_argument("--msn", nargs="*", help="Các trang MSN đã lưu")
+    parsers.add_argument("--dbtt", nargs="*", help="Các trang dbtt.edu.vn đã lưu")
+    sub.add_parser("records", help="Bộ nhớ bản ghi __slots__ so với dict").add_argument(
+        "pages", nargs="+"
+    )
+    sub.add_parser("numeric", help="Phân tích số từng giá trị so với theo cột").add_argument(
+        "pages", nargs="*", help="Các trang MSN đã lưu (bỏ trống để dùng dữ liệu giả lập)"
+    )
+    args = parser.parse_args()
+
+    if args.command == "stream":
+        bench_stream(args.pages)
+    elif args.command == "extract":
+        bench_extract(args.pages)
+    elif args.command == "throughput":
+        bench_throughput(args.pages, args.workers)
+    elif args.command == "decode":
+        bench_decode(args.pages)
+    elif args.command == "parsers":
+        bench_parsers(args.msn, args.dbtt)
+    elif args.command == "records":
+        bench_records(args.pages)
+    elif args.command == "numeric":
+        bench_numeric(args.pages)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,13 @@ from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    import lxml  # noqa: F401
+    # lxml nhanh hơn nhiều so với html.parser có sẵn; đặt BS4_PARSER để cố định bộ phân tích
+    BS4_PARSER = os.environ.get("BS4_PARSER", "lxml")
+except ImportError:
+    BS4_PARSER = os.environ.get("BS4_PARSER", "html.parser")
+
 # Danh sách các tỉnh
 PROVINCES = {
     # Đông Bắc Bộ
@@ -150,7 +157,7 @@ def get_districts_for_province(province_id, province_name):
         print(f"Đang lấy dữ liệu cho {province_name}...")
         response = requests.get(url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, BS4_PARSER)
 
         # Cách 1: Tìm phần có tiêu đề "Thời tiết quận huyện [tên tỉnh]"
         district_section = None